@@ -1,5 +1,6 @@
 # Configuration settings
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 
 class Settings(BaseSettings):
@@ -9,6 +10,11 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "a_very_secret_key_that_should_be_changed")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # bcrypt cost factor (2^rounds iterations). Tune so one hash takes roughly 250-500ms on the
+    # deployment hardware; stored hashes below this cost are upgraded on the next successful login.
+    BCRYPT_ROUNDS: int = 12
+    # Run Base.metadata.create_all when the app starts; disable where migrations own the schema.
+    RUN_DDL_ON_STARTUP: bool = True
 
     # Example for external service integration
     # EXTERNAL_API_KEY: Optional[str] = None
@@ -23,14 +29,18 @@ class Settings(BaseSettings):
     # MAIL_TLS: bool = True
     # MAIL_SSL: bool = False
 
-    class Config:
-        # If you have a .env file, pydantic will load it.
-        # Ensure `python-dotenv` is installed: pip install python-dotenv
-        env_file = ".env"
-        env_file_encoding = 'utf-8'
+    # If you have a .env file, pydantic will load it.
+    # Ensure `python-dotenv` is installed: pip install python-dotenv
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """ Parses env vars / .env once per process; use as `Depends(get_settings)` in routes. """
+    return Settings()
+
+# Module-level alias for import-time consumers (e.g. core.security constants); same cached instance.
+settings = get_settings()
 
 # You can print settings for debugging during startup, but be careful with sensitive data.
-# print(f"Loaded settings: {settings.dict(exclude={'SECRET_KEY', 'DATABASE_URL'})}") # Exclude sensitive fields
+# print(f"Loaded settings: {settings.model_dump(exclude={'SECRET_KEY', 'DATABASE_URL'})}") # Exclude sensitive fields
 from typing import Optional # Added this import to fix the error "name 'Optional' is not defined"
@@ -1,41 +1,109 @@
 # Password hashing and JWT handling
-from passlib.context import CryptContext
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from typing import Optional
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from cachetools import TTLCache
+from jose import JWTError, jwk, jwt
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
 from ..core.config import settings # Relative import to access settings
 from .. import schemas # Import schemas to access TokenData
 
 # Password Hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Straight calls into the bcrypt C extension. Hashes are the standard modular-crypt strings
+# ("$2b$<cost>$..."), so those written earlier through passlib's bcrypt handler still verify.
+def _bcrypt_rounds(hashed_password: str) -> int:
+    # "$2b$12$<salt+digest>": the cost is the second field.
+    return int(hashed_password.split("$")[2])
+
+def get_password_hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(settings.BCRYPT_ROUNDS)).decode()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError: # Not a bcrypt hash
+        return False
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+# A well-formed bcrypt hash at the configured cost (all-zero salt and digest) that no password
+# matches. Built as a string, so there is no hashing at import, and the very first dummy verify
+# already costs exactly as much as a real one.
+_DUMMY_HASH = f"$2b${settings.BCRYPT_ROUNDS:02d}${'.' * 53}"
+
+def dummy_verify_password(plain_password: str) -> None:
+    """ Spends one verify's worth of time; call when there is no stored hash to check against. """
+    verify_password(plain_password, _DUMMY_HASH)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies the password and, if the stored hash uses a lower bcrypt cost than BCRYPT_ROUNDS,
+    also returns a fresh hash to persist. Returns (verified, new_hash).
+    """
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if _bcrypt_rounds(hashed_password) >= settings.BCRYPT_ROUNDS:
+        return True, None
+    return True, get_password_hash(plain_password)
+
+# bcrypt is deliberately CPU-expensive, so when many users are created at once the hashes are
+# computed in parallel across worker processes (one per core). Single hashes run inline; the
+# pool is started on first bulk use.
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _hash_pool
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """ Hashes many passwords in parallel across the worker pool, preserving order. """
+    if len(passwords) < 2:
+        return [get_password_hash(p) for p in passwords]
+    return list(_get_hash_pool().map(get_password_hash, passwords))
 
 # JWT Token Handling
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+# HMAC key object built once. Given a plain string, jose re-constructs the key on every encode
+# and first tries (and fails) to parse it as a JWK JSON document on every decode.
+_JWT_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# token -> (username, exp) for tokens that already passed signature verification. Clients send
+# the same bearer token on every request, and a token's validity depends only on the token
+# itself and the clock, so later requests skip the HMAC check and the base64/JSON decoding.
+_verified_tokens: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+_verified_tokens_lock = threading.Lock()
+
 def decode_access_token(token: str) -> Optional[schemas.TokenData]:
+    with _verified_tokens_lock:
+        cached = _verified_tokens.get(token)
+    if cached is not None:
+        username, exp = cached
+        if exp is None or datetime.now(timezone.utc).timestamp() < exp:
+            return schemas.TokenData(username=username)
+        with _verified_tokens_lock:
+            _verified_tokens.pop(token, None)
+        return None
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _JWT_KEY, algorithms=[ALGORITHM])
         username: Optional[str] = payload.get("sub")
         if username is None:
             return None # Or raise an exception if "sub" is mandatory
+        with _verified_tokens_lock:
+            _verified_tokens[token] = (username, payload.get("exp"))
         # Add any other fields you expect in TokenData from the payload
         return schemas.TokenData(username=username)
     except JWTError:
@@ -1,87 +1,313 @@
 # Functions for CRUD operations
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional, Type, TypeVar
+from sqlalchemy.orm import Session, selectinload, contains_eager, raiseload
+from sqlalchemy import and_, bindparam, delete, exists, insert, literal, or_, select, update
+from sqlalchemy.sql import Select, func
+from sqlalchemy.engine import RowMapping
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type, TypeVar
+import base64
 import enum # Added for enum instance check
+import csv
+import io
+import itertools
+import threading
+from cachetools import TTLCache
 from . import models, schemas
-from .core.security import get_password_hash, verify_password # Added verify_password
+from .core.config import settings
+from .core.security import dummy_verify_password, get_password_hash, get_password_hashes, verify_and_update_password, verify_password # Added verify_password
 import datetime
 
 # Generic helper for updating a model instance
 ModelType = TypeVar("ModelType", bound=models.Base)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=schemas.BaseModel)
 
-def update_db_object(db_obj: ModelType, updates: UpdateSchemaType) -> ModelType:
-    update_data = updates.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_obj, key, value)
+def update_db_object(db: Session, db_obj: ModelType, values: dict) -> ModelType:
+    """
+    Writes `values` to db_obj's row as a single UPDATE ... RETURNING and commits.
+    The returned row (including onupdate columns such as updated_at) is loaded back into
+    db_obj, so no refresh SELECT is needed afterwards.
+    """
+    if not values:
+        return db_obj
+    model = type(db_obj)
+    return _update_returning(db, model, values, model.id == db_obj.id)
+
+def _update_returning(db: Session, model: Type[ModelType], values: dict, *criteria, options: tuple = ()) -> Optional[ModelType]:
+    """
+    Single UPDATE ... RETURNING scoped by `criteria`, then commit. Ownership checks go in the
+    WHERE clause, so no SELECT is needed first; returns None if no row matched.
+    `options` are loader options applied to the returned row (e.g. selectinload for its response).
+    """
+    stmt = (
+        update(model)
+        .where(*criteria)
+        .values(**values)
+        .returning(model)
+        .options(*options)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    db_obj = db.execute(stmt).scalar_one_or_none()
+    db.commit()
     return db_obj
 
+def _set_fields(updates: UpdateSchemaType) -> dict:
+    # Only the fields the client actually sent (pydantic v2 tracks them in model_fields_set).
+    return {key: getattr(updates, key) for key in updates.model_fields_set}
+
+# Generic helper for the *_bulk creators: one unit-of-work flush per batch, one commit overall.
+BULK_BATCH_SIZE = 10_000
+
+def _on_conflict_insert(db: Session):
+    # The dialect's insert() with ON CONFLICT support, or None for other backends. Imported on
+    # first use so loading this module doesn't pull in dialect packages the engine never uses.
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert
+    return None
+
+def _expire_loaded(db: Session, model: Type[ModelType], ids: Iterable[int], attribute_names: Optional[List[str]] = None) -> None:
+    # For writes that bypass the unit of work (bulk mappings, Core statements): expire the
+    # affected instances already in the identity map, without loading any that aren't.
+    for pk in ids:
+        obj = db.identity_map.get(Session.identity_key(model, pk))
+        if obj is not None:
+            db.expire(obj, attribute_names)
+
+def _save_in_batches(db: Session, objects: Iterable[ModelType], batch_size: int = BULK_BATCH_SIZE, commit: bool = True) -> int:
+    iterator = iter(objects)
+    saved = 0
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            break
+        db.bulk_save_objects(batch, return_defaults=False)
+        saved += len(batch)
+    if commit:
+        db.commit()
+    return saved
+
+class SeekCursor(NamedTuple):
+    """ Keyset pagination position: the sort value and id of the last row of the previous page. """
+    sort_value: datetime.datetime
+    id: int
+
+    def encode(self) -> str:
+        """ Opaque URL-safe token for handing the position to clients. """
+        return base64.urlsafe_b64encode(f"{self.sort_value.isoformat()}|{self.id}".encode()).decode()
+
+    @classmethod
+    def decode(cls, token: str) -> "SeekCursor":
+        """ Inverse of encode(); raises ValueError for a malformed token. """
+        try:
+            sort_value, _, id_ = base64.urlsafe_b64decode(token.encode()).decode().partition("|")
+            return cls(datetime.datetime.fromisoformat(sort_value), int(id_))
+        except (ValueError, UnicodeError) as e: # binascii.Error is a ValueError
+            raise ValueError("Invalid pagination cursor") from e
+
+def _seek_by_id(stmt: Select, id_column, after_id: Optional[int]) -> Select:
+    # Id-ordered keyset page: rows after `after_id`, read as a primary-key range instead of OFFSET.
+    stmt = stmt.order_by(id_column.asc())
+    if after_id is not None:
+        stmt = stmt.where(id_column > after_id)
+    return stmt
+
+def _seek_desc(stmt: Select, sort_column, id_column, after: Optional[SeekCursor]) -> Select:
+    # Rows strictly after `after` in (sort_column DESC, id DESC) order: an index range seek,
+    # so page N costs the same as page 1, unlike OFFSET which scans and discards skipped rows.
+    stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+    if after is not None:
+        stmt = stmt.where(or_(
+            sort_column < after.sort_value,
+            and_(sort_column == after.sort_value, id_column < after.id),
+        ))
+    return stmt
+
 # --- User CRUD operations ---
+class UserPrincipal(NamedTuple):
+    """ The user columns authentication needs; what most routes receive as `current_user`. """
+    id: int
+    username: str
+    is_active: bool
+
+# username -> UserPrincipal for the per-request auth lookup. Entries for a user are dropped when
+# it is created, updated or deleted through this module; the TTL bounds staleness otherwise.
+_principal_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_principal_cache_lock = threading.Lock()
+
+def _invalidate_user_principals(usernames: Iterable[str] = (), user_id: Optional[int] = None) -> None:
+    names = set(usernames)
+    with _principal_cache_lock:
+        for key in [k for k, p in _principal_cache.items() if k in names or p.id == user_id]:
+            _principal_cache.pop(key, None)
+
+def get_user_principal(db: Session, username: str) -> Optional[UserPrincipal]:
+    """ (id, username, is_active) for `username`, without hydrating a full User row. """
+    with _principal_cache_lock:
+        principal = _principal_cache.get(username)
+    if principal is not None:
+        return principal
+    row = db.execute(
+        select(models.User.id, models.User.username, models.User.is_active).where(models.User.username == username)
+    ).first()
+    if row is None:
+        return None
+    principal = UserPrincipal(*row)
+    with _principal_cache_lock:
+        _principal_cache[username] = principal
+    return principal
+
 def get_user(db: Session, user_id: int) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    # Session.get checks the identity map before emitting a primary-key SELECT.
+    return db.get(models.User, user_id)
+
+# User lookups built once at import and executed with bound values, so the auth paths hit the
+# compiled-statement cache without reconstructing the SELECT on every call.
+_USER_BY_EMAIL = select(models.User).where(models.User.email == bindparam("value"))
+_USER_BY_USERNAME = select(models.User).where(models.User.username == bindparam("value"))
 
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.email == email).first()
+    return db.scalars(_USER_BY_EMAIL, {"value": email}).one_or_none()
 
 def get_user_by_username(db: Session, username: str) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.username == username).first()
+    return db.scalars(_USER_BY_USERNAME, {"value": username}).one_or_none()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]: # Make sure this is not duplicated or is the correct one
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.User]:
+    stmt = _seek_by_id(select(models.User), models.User.id, after_id)
+    return list(db.scalars(stmt.offset(skip).limit(limit)))
 
-def create_user(db: Session, user_create: schemas.UserCreate) -> models.User:
-    hashed_password = get_password_hash(user_create.password)
+def create_user(db: Session, user_create: schemas.UserCreate, commit: bool = True) -> models.User:
     db_user = models.User(
         email=user_create.email,
         username=user_create.username,
-        hashed_password=hashed_password
+        hashed_password=get_password_hash(user_create.password)
     )
     db.add(db_user)
-    # db.commit() # Let the session manager (e.g., test fixture) handle commit/rollback
-    db.flush() # Ensure db_user gets an ID and is in current transaction
-    db.refresh(db_user)
+    if commit:
+        db.commit()
+    else:
+        db.flush() # Ensure db_user gets an ID and is in current transaction
+    _invalidate_user_principals([db_user.username])
     return db_user
 
+def create_users_bulk(db: Session, users_create: List[schemas.UserCreate], batch_size: int = BULK_BATCH_SIZE, commit: bool = True) -> int:
+    """ Inserts many users with batched flushes and a single commit. Returns the number of rows saved. """
+    hashes = get_password_hashes([u.password for u in users_create]) # Parallel across worker processes
+    db_users = (
+        models.User(email=u.email, username=u.username, hashed_password=h)
+        for u, h in zip(users_create, hashes)
+    )
+    saved = _save_in_batches(db, db_users, batch_size=batch_size, commit=commit)
+    _invalidate_user_principals(u.username for u in users_create)
+    return saved
+
 def update_user(db: Session, db_user: models.User, user_update: schemas.UserUpdate) -> models.User:
-    db_user = update_db_object(db_user, user_update)
+    db_user = update_db_object(db, db_user, _set_fields(user_update))
+    _invalidate_user_principals(user_id=db_user.id) # username / is_active may have changed
+    return db_user
+
+def get_registration_conflict(db: Session, email: str, username: str) -> Optional[str]:
+    """
+    Which of `email` / `username` is already taken: "email", "username", or None. One query for
+    both columns; at most two rows can match (one per unique column), and email is reported first.
+    """
+    rows = db.execute(
+        select(models.User.email, models.User.username)
+        .where(or_(models.User.email == email, models.User.username == username))
+        .limit(2)
+    ).all()
+    if any(row.email == email for row in rows):
+        return "email"
+    if rows:
+        return "username"
+    return None
+
+# Login only needs the user's own columns. raiseload("*") makes any relationship access on
+# the returned object fail loudly instead of issuing a lazy SELECT.
+_LOGIN_BY_USERNAME = _USER_BY_USERNAME.options(raiseload("*"))
+_LOGIN_BY_EMAIL = _USER_BY_EMAIL.options(raiseload("*"))
+
+def _get_login_user(db: Session, stmt: Select, value: str) -> Optional[models.User]:
+    return db.scalars(stmt, {"value": value}).one_or_none()
+
+def authenticate_user(db: Session, username: str, password: str) -> Optional[models.User]:
+    """
+    Looks the user up by username, then by email, and verifies the password.
+    A hash stored with an outdated bcrypt cost is re-hashed and saved on success.
+    """
+    db_user = _get_login_user(db, _LOGIN_BY_USERNAME, username) or _get_login_user(db, _LOGIN_BY_EMAIL, username)
+    # End the read transaction so the pooled connection isn't held for the ~100ms bcrypt check;
+    # expire_on_commit=False keeps db_user's attributes loaded.
     db.commit()
-    db.refresh(db_user)
+    if db_user is None:
+        dummy_verify_password(password) # Unknown users take as long as wrong passwords, so timing can't enumerate accounts
+        return None
+    verified, new_hash = verify_and_update_password(password, db_user.hashed_password)
+    if not verified:
+        return None
+    if new_hash is not None:
+        db_user.hashed_password = new_hash
+        db.commit()
     return db_user
 
 def update_password(db: Session, db_user: models.User, password_update: schemas.PasswordUpdate) -> Optional[models.User]:
+    # Hash before verifying so a wrong current password costs the same time as a right one.
+    new_hashed_password = get_password_hash(password_update.new_password)
     if not verify_password(password_update.current_password, db_user.hashed_password):
         return None # Current password incorrect
-    new_hashed_password = get_password_hash(password_update.new_password)
-    db_user.hashed_password = new_hashed_password
-    db_user.updated_at = datetime.datetime.utcnow()
+    db_user.hashed_password = new_hashed_password # updated_at is set by the database (onupdate=func.now())
     db.commit()
-    db.refresh(db_user)
     return db_user
 
-def delete_user(db: Session, user_id: int) -> Optional[models.User]:
-    db_user = get_user(db, user_id)
-    if db_user:
-        db.delete(db_user)
+def _delete_returning_id(db: Session, model: Type[ModelType], *criteria) -> Optional[int]:
+    """
+    Single DELETE ... RETURNING id scoped by `criteria`; dependent rows go through the
+    ON DELETE rules on the foreign keys. Returns the deleted id, or None if nothing matched.
+    """
+    deleted_id = db.execute(delete(model).where(*criteria).returning(model.id)).scalar_one_or_none()
+    if deleted_id is not None:
         db.commit()
-    return db_user
+        # The cascaded deletes / SET NULLs happened in the database, behind the identity map.
+        db.expire_all()
+    return deleted_id
+
+def delete_user(db: Session, user_id: int) -> Optional[int]:
+    deleted_id = _delete_returning_id(db, models.User, models.User.id == user_id)
+    _invalidate_user_principals(user_id=user_id)
+    return deleted_id
 
 # --- Project CRUD operations ---
-def get_project(db: Session, project_id: int, user_id: Optional[int] = None) -> Optional[models.Project]:
-    query = db.query(models.Project).filter(models.Project.id == project_id)
-    if user_id is not None: # Filter by owner if user_id is provided
-        query = query.filter(models.Project.owner_id == user_id)
-    return query.first()
+# Loader options for the nested schemas.Project response (tasks, each with tags and sub_tasks):
+# one IN-list SELECT per relationship for the whole page instead of lazy loads per project/task.
+# Sub-tasks share their parent's project, so they come back already loaded through Project.tasks.
+# In debug builds every relationship not listed here raises on access instead of lazy loading,
+# so a schema change that walks a new relationship fails loudly rather than becoming an N+1.
+_STRICT_LOADING = (raiseload("*"),) if settings.DEBUG_MODE else ()
+_PROJECT_RESPONSE_LOAD = selectinload(models.Project.tasks).options(
+    selectinload(models.Task.tags), selectinload(models.Task.sub_tasks), *_STRICT_LOADING,
+)
 
 # Removed duplicated get_projects_by_user. This is the correct one.
-def get_projects_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, archived: Optional[bool] = None) -> List[models.Project]:
-    query = db.query(models.Project).filter(models.Project.owner_id == user_id)
+def get_project(db: Session, project_id: int, user_id: Optional[int] = None, with_tasks: bool = False) -> Optional[models.Project]:
+    # with_tasks: the caller serializes the project's task tree, so load it up front.
+    db_project = db.get(models.Project, project_id, options=[_PROJECT_RESPONSE_LOAD, *_STRICT_LOADING] if with_tasks else None)
+    if db_project is None or (user_id is not None and db_project.owner_id != user_id): # Filter by owner if user_id is provided
+        return None
+    return db_project
+
+def get_projects_by_user(
+    db: Session, user_id: int, skip: int = 0, limit: int = 100, archived: Optional[bool] = None, after_id: Optional[int] = None
+) -> List[models.Project]:
+    stmt = select(models.Project).options(_PROJECT_RESPONSE_LOAD, *_STRICT_LOADING).where(models.Project.owner_id == user_id)
     if archived is not None:
-        query = query.filter(models.Project.is_archived == archived)
-    return query.offset(skip).limit(limit).all()
+        stmt = stmt.where(models.Project.is_archived == archived)
+    stmt = _seek_by_id(stmt, models.Project.id, after_id)
+    return list(db.scalars(stmt.offset(skip).limit(limit)))
 
-def create_project(db: Session, project_create: schemas.ProjectCreate, owner_id: int) -> models.Project:
-    db_project_data = project_create.dict()
+def create_project(db: Session, project_create: schemas.ProjectCreate, owner_id: int, commit: bool = True) -> models.Project:
+    db_project_data = project_create.model_dump()
 
     # Ensure is_archived defaults to False if not provided
     is_archived = db_project_data.get("is_archived", False)
@@ -90,53 +316,151 @@ def create_project(db: Session, project_create: schemas.ProjectCreate, owner_id:
     if is_archived:
         # If archived_at is not provided with is_archived=True, set it.
         if not db_project_data.get("archived_at"):
-            db_project_data["archived_at"] = datetime.datetime.utcnow()
+            db_project_data["archived_at"] = func.now() # Computed by the database in the INSERT
     else:
         # If not archived, ensure archived_at is None.
         db_project_data["archived_at"] = None
 
     db_project = models.Project(**db_project_data, owner_id=owner_id)
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     return db_project
 
-def update_project(db: Session, db_project: models.Project, project_update: schemas.ProjectUpdate) -> models.Project:
-    update_data = project_update.dict(exclude_unset=True)
-
-    # Apply all updates first
-    for key, value in update_data.items():
-        setattr(db_project, key, value)
-
+def _project_update_values(project_update: schemas.ProjectUpdate) -> dict:
+    values = project_update.model_dump(exclude_unset=True)
     # Specific logic if is_archived was part of the update
-    if 'is_archived' in update_data:
-        if db_project.is_archived:
-            # If is_archived is True, and archived_at was not set or set to None by the update, set it now.
-            if db_project.archived_at is None:
-                db_project.archived_at = datetime.datetime.utcnow()
+    if 'is_archived' in values:
+        if values['is_archived']:
+            # Archiving stamps archived_at, keeping an existing timestamp unless the update
+            # explicitly cleared it; computed by the database in the UPDATE.
+            if values.get('archived_at') is None:
+                values['archived_at'] = func.now() if 'archived_at' in values else func.coalesce(models.Project.archived_at, func.now())
         else:
             # If is_archived is False, ensure archived_at is None.
-            db_project.archived_at = None
+            values['archived_at'] = None
+    return values
 
-    db.commit()
-    db.refresh(db_project)
-    return db_project
+def update_project(db: Session, db_project: models.Project, project_update: schemas.ProjectUpdate) -> models.Project:
+    return update_db_object(db, db_project, _project_update_values(project_update))
+
+def update_project_by_id(db: Session, project_id: int, user_id: int, project_update: schemas.ProjectUpdate) -> Optional[models.Project]:
+    """
+    Updates the user's project in one UPDATE ... RETURNING, with its task tree loaded for the
+    response; None if it doesn't exist or isn't theirs.
+    """
+    values = _project_update_values(project_update)
+    if not values:
+        return get_project(db, project_id=project_id, user_id=user_id, with_tasks=True)
+    return _update_returning(
+        db, models.Project, values, models.Project.id == project_id, models.Project.owner_id == user_id,
+        options=(_PROJECT_RESPONSE_LOAD, *_STRICT_LOADING),
+    )
 
-def delete_project(db: Session, project_id: int, user_id: int) -> Optional[models.Project]:
-    # Ensure user owns the project before deleting
-    db_project = db.query(models.Project).filter(models.Project.id == project_id, models.Project.owner_id == user_id).first()
-    if db_project:
-        db.delete(db_project) # Tasks associated might be deleted due to cascade in model
-        db.commit()
-    return db_project
+def delete_project(db: Session, project_id: int, user_id: int) -> Optional[int]:
+    # Ownership is part of the DELETE's WHERE clause; tasks go with it via ON DELETE CASCADE
+    return _delete_returning_id(db, models.Project, models.Project.id == project_id, models.Project.owner_id == user_id)
 
 # --- Task CRUD operations ---
+# Task ownership statements, built once at import with named bind parameters so every call
+# reuses the same construct (and its compiled form from the statement cache).
+# Scoped task lookup stays a single query: the ownership join also populates Task.project.
+_OWNED_TASK = (
+    select(models.Task)
+    .join(models.Project)
+    .options(contains_eager(models.Task.project), selectinload(models.Task.tags))
+    .where(models.Task.id == bindparam("task_id"), models.Project.owner_id == bindparam("user_id"))
+)
+# Ownership check as a single EXISTS; no Task row is hydrated.
+_USER_OWNS_TASK = select(exists().where(
+    models.Task.id == bindparam("task_id"),
+    models.Task.project_id == models.Project.id,
+    models.Project.owner_id == bindparam("user_id"),
+))
+# Task (via its project) and tag ownership verified together in one round trip.
+_USER_OWNS_TASK_AND_TAG = (
+    select(models.Task.id, models.Tag.id)
+    .join(models.Project, models.Project.id == models.Task.project_id)
+    .join(models.Tag, models.Tag.user_id == models.Project.owner_id)
+    .where(
+        models.Task.id == bindparam("task_id"),
+        models.Tag.id == bindparam("tag_id"),
+        models.Project.owner_id == bindparam("user_id"),
+    )
+)
+
 def get_task(db: Session, task_id: int, user_id: Optional[int] = None) -> Optional[models.Task]:
     """ Gets a specific task. If user_id is provided, it ensures the task belongs to a project owned by the user. """
-    query = db.query(models.Task).filter(models.Task.id == task_id)
-    if user_id is not None:
-        query = query.join(models.Project).filter(models.Project.owner_id == user_id)
-    return query.first()
+    if user_id is None:
+        # Plain primary-key lookup: served from the identity map when the task is already loaded.
+        return db.get(models.Task, task_id, options=[selectinload(models.Task.tags)])
+    return db.scalars(_OWNED_TASK, {"task_id": task_id, "user_id": user_id}).first()
+
+# Optional get_tasks filters, built once at import: parameter name -> predicate on a named bind
+# parameter. Values are passed as execute parameters, so each filter combination compiles to one
+# cached statement instead of rebuilding the column expressions on every call.
+_TASK_FILTERS = (
+    ("project_id", models.Task.project_id == bindparam("f_project_id")),
+    ("completed", models.Task.completed == bindparam("f_completed")),
+    ("due_date_before", models.Task.due_date <= bindparam("f_due_date_before")),
+    ("due_date_after", models.Task.due_date >= bindparam("f_due_date_after")),
+    ("priority", models.Task.priority == bindparam("f_priority")),
+    ("parent_task_id", models.Task.parent_task_id == bindparam("f_parent_task_id")),
+    ("is_recurring", models.Task.is_recurring == bindparam("f_is_recurring")),
+)
+
+def _tasks_select(
+    user_id: int,
+    project_id: Optional[int] = None,
+    completed: Optional[bool] = None,
+    due_date_before: Optional[datetime.datetime] = None,
+    due_date_after: Optional[datetime.datetime] = None,
+    priority: Optional[int] = None,
+    parent_task_id: Optional[int] = None,
+    is_recurring: Optional[bool] = None,
+    tags: Optional[List[int]] = None,
+) -> Tuple[Select, dict]:
+    """
+    Filtered, ordered task SELECT shared by get_tasks (paged list) and iter_tasks (streamed),
+    returned with the bind values for its optional filters.
+    """
+    # Eager-load what the Task response serializes so a page of N tasks costs 2-3 queries, not 1+N.
+    # contains_eager reuses the ownership join for Task.project instead of adding a second one.
+    stmt = (
+        select(models.Task)
+        .join(models.Project)
+        .options(
+            contains_eager(models.Task.project),
+            selectinload(models.Task.tags),
+            selectinload(models.Task.sub_tasks),
+        )
+        .where(models.Project.owner_id == user_id)
+    )
+    values = {
+        "project_id": project_id,
+        "completed": completed,
+        "due_date_before": due_date_before,
+        "due_date_after": due_date_after,
+        "priority": priority,
+        "parent_task_id": parent_task_id,
+        "is_recurring": is_recurring,
+    }
+    active = [(name, predicate) for name, predicate in _TASK_FILTERS if values[name] is not None]
+    if active:
+        stmt = stmt.where(*(predicate for _, predicate in active))
+    params = {f"f_{name}": values[name] for name, _ in active}
+    if tags: # New filter for tags (list of tag IDs)
+        # This ensures task has AT LEAST ONE of the provided tags.
+        # EXISTS on task_tags rather than join + DISTINCT: no duplicate rows to sort away,
+        # and the unfiltered query plan is untouched.
+        link = models.task_tag_association
+        stmt = stmt.where(exists().where(link.c.task_id == models.Task.id, link.c.tag_id.in_(tags)))
+
+    # Keep this ORDER BY in step with the ix_task_owner_sort index on models.Task.
+    stmt = stmt.order_by(models.Task.order_in_list.asc(), models.Task.priority.desc(), models.Task.due_date.asc(), models.Task.created_at.asc())
+    return stmt, params
 
 def get_tasks(
     db: Session,
@@ -146,67 +470,108 @@ def get_tasks(
     due_date_before: Optional[datetime.datetime] = None,
     due_date_after: Optional[datetime.datetime] = None,
     priority: Optional[int] = None,
-    parent_task_id: Optional[int] = None,  # Added missing parameter
-    is_recurring: Optional[bool] = None,   # Added missing parameter
-    tags: Optional[List[int]] = None,      # Added missing parameter (list of tag IDs)
+    parent_task_id: Optional[int] = None,
+    is_recurring: Optional[bool] = None,
+    tags: Optional[List[int]] = None, # Tag IDs; a task matches if it has any of them
     skip: int = 0,
     limit: int = 100
 ) -> List[models.Task]:
-    query = db.query(models.Task).join(models.Project).filter(models.Project.owner_id == user_id)
-    if project_id is not None:
-        query = query.filter(models.Task.project_id == project_id)
-    if completed is not None:
-        query = query.filter(models.Task.completed == completed)
-    if due_date_before is not None:
-        query = query.filter(models.Task.due_date <= due_date_before)
-    if due_date_after is not None:
-        query = query.filter(models.Task.due_date >= due_date_after)
-    if priority is not None:
-        query = query.filter(models.Task.priority == priority)
-    # Add parent_task_id filter if that feature is implemented in models.Task
-    # if parent_task_id is not None:
-    #     query = query.filter(models.Task.parent_id == parent_task_id)
-    if parent_task_id is not None: # New filter
-        query = query.filter(models.Task.parent_task_id == parent_task_id)
-    if is_recurring is not None: # New filter
-        query = query.filter(models.Task.is_recurring == is_recurring)
-    if tags: # New filter for tags (list of tag IDs)
-        # This ensures task has AT LEAST ONE of the provided tags.
-        # If task must have ALL tags, a different approach with multiple joins or subqueries would be needed.
-        query = query.join(models.Task.tags).filter(models.Tag.id.in_(tags)).distinct()
-
-    return query.order_by(models.Task.order_in_list.asc(), models.Task.priority.desc(), models.Task.due_date.asc(), models.Task.created_at.asc()).offset(skip).limit(limit).all()
-
-
-def create_task(db: Session, task_create: schemas.TaskCreate) -> models.Task:
+    stmt, params = _tasks_select(
+        user_id, project_id=project_id, completed=completed,
+        due_date_before=due_date_before, due_date_after=due_date_after, priority=priority,
+        parent_task_id=parent_task_id, is_recurring=is_recurring, tags=tags,
+    )
+    return list(db.scalars(stmt.offset(skip).limit(limit), params))
+
+def iter_tasks(db: Session, user_id: int, chunk: int = 1000, **filters) -> Iterator[models.Task]:
+    """
+    Streams every matching task (same filters as get_tasks, no paging) in chunks of `chunk`
+    rows from a server-side cursor, so exports don't materialize the whole result at once.
+    """
+    stmt, params = _tasks_select(user_id, **filters)
+    yield from db.scalars(stmt.execution_options(stream_results=True, yield_per=chunk), params)
+
+# Column-only project task list: plain rows, no ORM identity map or relationship state, and
+# served by ix_task_project_order (project_id, order_in_list, priority, due_date).
+_PROJECT_TASK_SUMMARIES = (
+    select(models.Task.id, models.Task.title, models.Task.completed, models.Task.priority, models.Task.due_date)
+    .join(models.Project, models.Project.id == models.Task.project_id)
+    .where(models.Task.project_id == bindparam("project_id"), models.Project.owner_id == bindparam("user_id"))
+    .order_by(models.Task.order_in_list, models.Task.id)
+)
+
+def list_tasks_fast(db: Session, project_id: int, user_id: int) -> List[RowMapping]:
+    """
+    Lightweight listing of a user's project tasks as mappings (id, title, completed, priority,
+    due_date) in list order, for callers that don't need full Task objects.
+    """
+    return db.execute(_PROJECT_TASK_SUMMARIES, {"project_id": project_id, "user_id": user_id}).mappings().all()
+
+def _build_task(task_create: schemas.TaskCreate) -> models.Task:
     # project_id is now part of task_create and should be validated if necessary by the caller or here
     # assignee_id is also part of task_create
     # parent_task_id, order_in_list, is_recurring, recurring_schedule are also in task_create
-    db_task_data = task_create.dict()
+    db_task_data = task_create.model_dump()
 
     # Ensure project_id is present, as it's required by model. TaskCreate schema requires it.
     if db_task_data.get("project_id") is None:
         raise ValueError("project_id is required to create a task")
 
-    db_task = models.Task(**db_task_data)
+    return models.Task(**db_task_data)
+
+def create_task(db: Session, task_create: schemas.TaskCreate, commit: bool = True) -> models.Task:
+    db_task = _build_task(task_create)
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     return db_task
 
-def update_task(db: Session, db_task: models.Task, task_update: schemas.TaskUpdate) -> models.Task:
-    db_task = update_db_object(db_task, task_update)
-    db.commit()
-    db.refresh(db_task)
-    return db_task
+def create_tasks_bulk(db: Session, tasks_create: List[schemas.TaskCreate], batch_size: int = BULK_BATCH_SIZE, commit: bool = True) -> int:
+    """ Inserts many tasks with batched flushes and a single commit. Callers must have verified project ownership. """
+    return _save_in_batches(db, (_build_task(t) for t in tasks_create), batch_size=batch_size, commit=commit)
 
-def delete_task(db: Session, task_id: int, user_id: int) -> Optional[models.Task]:
-    # Ensure user has rights to delete this task (e.g. owns the project task belongs to)
-    db_task = get_task(db, task_id, user_id=user_id)
-    if db_task:
-        db.delete(db_task)
+def update_task(db: Session, db_task: models.Task, task_update: schemas.TaskUpdate) -> models.Task:
+    return update_db_object(db, db_task, _set_fields(task_update))
+
+def update_tasks_bulk(db: Session, updates: List[Tuple[int, schemas.TaskUpdate]], user_id: int) -> int:
+    """
+    Applies many partial task updates as executemany UPDATEs by primary key with one commit,
+    skipping per-object flush and refresh. Tasks not owned by `user_id` are skipped.
+    Returns the number of tasks updated.
+    """
+    task_ids = {task_id for task_id, _ in updates}
+    if not task_ids:
+        return 0
+    owned_ids = set(db.scalars(
+        select(models.Task.id)
+        .join(models.Project)
+        .where(models.Task.id.in_(task_ids), models.Project.owner_id == user_id)
+    ))
+    mappings = [
+        {"id": task_id, **task_update.model_dump(exclude_unset=True)}
+        for task_id, task_update in updates
+        if task_id in owned_ids
+    ]
+    mappings = [m for m in mappings if len(m) > 1] # Nothing to SET for empty updates
+    if mappings:
+        db.bulk_update_mappings(models.Task, mappings)
         db.commit()
-    return db_task
+        _expire_loaded(db, models.Task, (m["id"] for m in mappings))
+    return len(mappings)
+
+def _user_owns_task(db: Session, task_id: int, user_id: int) -> bool:
+    return db.scalar(_USER_OWNS_TASK, {"task_id": task_id, "user_id": user_id}) is True
+
+def delete_task(db: Session, task_id: int, user_id: int) -> Optional[int]:
+    # Ensure user has rights to delete this task (e.g. owns the project task belongs to);
+    # sub-tasks and tag links are removed by ON DELETE CASCADE
+    return _delete_returning_id(
+        db, models.Task,
+        models.Task.id == task_id,
+        models.Task.project_id.in_(select(models.Project.id).where(models.Project.owner_id == user_id)),
+    )
 
 # Task reordering logic placeholder - this is complex and depends on specific model fields (e.g., an 'order' field)
 # def reorder_task(db: Session, task_id: int, new_order: int, user_id: int):
@@ -216,136 +581,281 @@ def delete_task(db: Session, task_id: int, user_id: int) -> Optional[models.Task
 #     pass
 
 def reorder_tasks(db: Session, reorder_items: List[schemas.TaskReorderItem], user_id: int) -> List[models.Task]:
-    updated_tasks = []
-    task_ids_to_fetch = [item.task_id for item in reorder_items]
-
-    # Fetch all tasks to be modified in one query if possible, though ownership check is per task.
-    # For simplicity, fetch one by one to include ownership check via get_task.
-    # In a high-performance scenario, batch fetching and then filtering could be an option.
-
+    task_ids = [item.task_id for item in reorder_items]
+
+    # One ownership query for the whole batch instead of a get_task() per item.
+    owned_ids = set(db.scalars(
+        select(models.Task.id)
+        .join(models.Project)
+        .where(models.Task.id.in_(task_ids), models.Project.owner_id == user_id)
+    ))
+    for task_id in task_ids:
+        if task_id not in owned_ids:
+            raise Exception(f"Task with id {task_id} not found or user does not have access.") # Should be specific HTTP Exception in router
+
+    # Likewise one query for every destination project, validated locally per item below.
+    new_project_ids = {item.new_project_id for item in reorder_items if item.new_project_id is not None}
+    owned_project_ids = set(db.scalars(
+        select(models.Project.id).where(models.Project.id.in_(new_project_ids), models.Project.owner_id == user_id)
+    )) if new_project_ids else set()
+
+    mappings = []
     for item in reorder_items:
-        db_task = get_task(db, task_id=item.task_id, user_id=user_id)
-        if not db_task:
-            # Or collect errors and raise a single HTTPException
-            raise Exception(f"Task with id {item.task_id} not found or user does not have access.") # Should be specific HTTP Exception in router
-
+        mapping = {"id": item.task_id}
         if item.new_order_in_list is not None:
-            db_task.order_in_list = item.new_order_in_list
+            mapping["order_in_list"] = item.new_order_in_list
 
         if item.new_status is not None:
             # Assuming new_status maps to 'completed'.
             # This logic might need to be more sophisticated if 'new_status' means other states.
             if item.new_status.lower() == "completed":
-                db_task.completed = True
+                mapping["completed"] = True
             elif item.new_status.lower() == "pending": # Example for "pending"
-                db_task.completed = False
+                mapping["completed"] = False
             # Add more status mappings if necessary, or adjust Task model for a string status field.
 
-        if item.new_project_id is not None and item.new_project_id != db_task.project_id:
+        if item.new_project_id is not None:
             # Verify user has access to the new project
-            db_project = get_project(db, project_id=item.new_project_id, user_id=user_id)
-            if not db_project:
+            if item.new_project_id not in owned_project_ids:
                 raise Exception(f"Project with id {item.new_project_id} not found or user does not have access.") # Specific HTTP Exception in router
-            db_task.project_id = item.new_project_id
+            mapping["project_id"] = item.new_project_id
             # When moving projects, parent_task_id might need to be cleared if the parent is in a different project,
             # or this operation should be disallowed. For now, we allow moving.
-            # If parent was in old project, parent_task_id might become invalid contextually.
-            # Consider clearing parent_task_id if project changes:
-            # db_task.parent_task_id = None
 
-        db.add(db_task) # Add to session, changes will be part of the commit
-        updated_tasks.append(db_task)
+        if len(mapping) > 1:
+            mappings.append(mapping)
 
-    db.commit()
-    for task in updated_tasks: # Refresh each task to get updated state from DB if needed by caller
-        db.refresh(task)
+    # All changes go out as one executemany UPDATE by primary key, committed once.
+    if mappings:
+        db.bulk_update_mappings(models.Task, mappings)
+        db.commit()
 
-    return updated_tasks
+    # Single reload of the affected tasks (with what the response serializes), in request order.
+    tasks_by_id = {
+        task.id: task
+        for task in db.scalars(
+            select(models.Task)
+            .options(selectinload(models.Task.tags), selectinload(models.Task.sub_tasks))
+            .where(models.Task.id.in_(task_ids))
+            .execution_options(populate_existing=True) # Overwrite instances loaded before the bulk UPDATE
+        )
+    }
+    return [tasks_by_id[task_id] for task_id in dict.fromkeys(task_ids)]
 
 
 # --- Tag CRUD operations ---
 def get_tag(db: Session, tag_id: int, user_id: int) -> Optional[models.Tag]:
-    return db.query(models.Tag).filter(models.Tag.id == tag_id, models.Tag.user_id == user_id).first()
+    db_tag = db.get(models.Tag, tag_id)
+    return db_tag if db_tag is not None and db_tag.user_id == user_id else None
 
-def get_tag_by_name(db: Session, name: str, user_id: int) -> Optional[models.Tag]:
-    return db.query(models.Tag).filter(models.Tag.name == name, models.Tag.user_id == user_id).first()
+# (user_id, tag name) -> tag id. Only ids are cached (ORM objects are session-bound); a hit is
+# re-read with Session.get and re-checked, so a stale entry just falls through to the query.
+_tag_id_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_tag_id_cache_lock = threading.Lock()
+
+def _invalidate_tag_cache(user_id: int) -> None:
+    with _tag_id_cache_lock:
+        for key in [k for k in _tag_id_cache if k[0] == user_id]:
+            _tag_id_cache.pop(key, None)
 
-def get_tags_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.Tag]:
-    return db.query(models.Tag).filter(models.Tag.user_id == user_id).offset(skip).limit(limit).all()
+def get_tag_by_name(db: Session, name: str, user_id: int) -> Optional[models.Tag]:
+    with _tag_id_cache_lock:
+        cached_id = _tag_id_cache.get((user_id, name))
+    if cached_id is not None:
+        db_tag = db.get(models.Tag, cached_id)
+        if db_tag is not None and db_tag.user_id == user_id and db_tag.name == name:
+            return db_tag
+    db_tag = db.query(models.Tag).filter(models.Tag.name == name, models.Tag.user_id == user_id).first()
+    if db_tag is not None:
+        with _tag_id_cache_lock:
+            _tag_id_cache[(user_id, name)] = db_tag.id
+    return db_tag
 
-def create_tag(db: Session, tag_create: schemas.TagCreate, user_id: int) -> models.Tag:
-    existing_tag = get_tag_by_name(db, name=tag_create.name, user_id=user_id)
-    if existing_tag:
+def get_tags_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Tag]:
+    stmt = _seek_by_id(select(models.Tag).where(models.Tag.user_id == user_id), models.Tag.id, after_id)
+    return list(db.scalars(stmt.offset(skip).limit(limit)))
+
+def create_tag(db: Session, tag_create: schemas.TagCreate, user_id: int, commit: bool = True) -> models.Tag:
+    db_tag_data = tag_create.model_dump()
+    dialect_insert = _on_conflict_insert(db)
+    if dialect_insert is not None:
+        # INSERT ... ON CONFLICT (user_id, name) DO NOTHING RETURNING: one round trip, and two
+        # concurrent creates of the same name can't both pass a prior SELECT and then collide.
+        stmt = (
+            dialect_insert(models.Tag)
+            .values(**db_tag_data, user_id=user_id)
+            .on_conflict_do_nothing(index_elements=["user_id", "name"])
+            .returning(models.Tag)
+        )
+        db_tag = db.scalars(stmt).one_or_none()
+    else:
+        db_tag = None
+        if get_tag_by_name(db, name=tag_create.name, user_id=user_id) is None:
+            db_tag = models.Tag(**db_tag_data, user_id=user_id)
+            db.add(db_tag)
+            db.flush()
+    if db_tag is None:
         # This should be handled by the router to return a proper HTTP_400_BAD_REQUEST
         raise ValueError("Tag with this name already exists for this user.")
-    db_tag_data = tag_create.dict()
-    db_tag = models.Tag(**db_tag_data, user_id=user_id)
-    db.add(db_tag)
-    db.commit()
-    db.refresh(db_tag)
+    if commit:
+        db.commit()
+    _invalidate_tag_cache(user_id)
     return db_tag
 
+def create_tags_bulk(db: Session, tags_create: List[schemas.TagCreate], user_id: int, batch_size: int = BULK_BATCH_SIZE, commit: bool = True) -> int:
+    """
+    Inserts many tags for a user, skipping names the user already has (or repeats within the
+    batch), with a single commit. Returns the number of tags inserted.
+    """
+    rows = [{**t.model_dump(), "user_id": user_id} for t in tags_create]
+    dialect_insert = _on_conflict_insert(db)
+    inserted = 0
+    if dialect_insert is not None:
+        # One multi-row INSERT ... ON CONFLICT DO NOTHING per batch; conflicting rows aren't counted.
+        for start in range(0, len(rows), batch_size):
+            stmt = dialect_insert(models.Tag).values(rows[start:start + batch_size]).on_conflict_do_nothing(index_elements=["user_id", "name"])
+            inserted += db.execute(stmt).rowcount
+        if commit:
+            db.commit()
+    else:
+        taken = set(db.scalars(select(models.Tag.name).where(models.Tag.user_id == user_id)))
+        new_rows = []
+        for row in rows:
+            if row["name"] not in taken:
+                taken.add(row["name"])
+                new_rows.append(models.Tag(**row))
+        inserted = _save_in_batches(db, new_rows, batch_size=batch_size, commit=commit)
+    _invalidate_tag_cache(user_id)
+    return inserted
+
 def update_tag(db: Session, db_tag: models.Tag, tag_update: schemas.TagUpdate, user_id: int) -> models.Tag:
     # Ensure db_tag belongs to the user_id; router should do this before calling.
     if db_tag.user_id != user_id:
         # This check is a safeguard. Router should prevent this.
         raise ValueError("Tag does not belong to the current user.")
 
-    update_data = tag_update.dict(exclude_unset=True)
+    update_data = tag_update.model_dump(exclude_unset=True)
     if "name" in update_data and update_data["name"] != db_tag.name:
         existing_tag_with_new_name = get_tag_by_name(db, name=update_data["name"], user_id=user_id)
         if existing_tag_with_new_name and existing_tag_with_new_name.id != db_tag.id:
             raise ValueError("Another tag with this name already exists for this user.")
 
-    db_tag = update_db_object(db_tag, tag_update) # Pass the original tag_update
-    db.commit()
-    db.refresh(db_tag)
+    db_tag = update_db_object(db, db_tag, update_data)
+    _invalidate_tag_cache(user_id)
     return db_tag
 
-def delete_tag(db: Session, tag_id: int, user_id: int) -> Optional[models.Tag]:
-    # Fetch the tag by id and user_id to ensure ownership before deleting
-    db_tag = get_tag(db, tag_id=tag_id, user_id=user_id)
-    if db_tag:
-        db.delete(db_tag)
-        db.commit()
+def update_tag_by_id(db: Session, tag_id: int, user_id: int, tag_update: schemas.TagUpdate) -> Optional[models.Tag]:
+    """ Updates the user's tag in one UPDATE ... RETURNING; None if it doesn't exist or isn't theirs. """
+    update_data = tag_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return get_tag(db, tag_id=tag_id, user_id=user_id)
+    if "name" in update_data:
+        # Fast path for the common clash, surfaced as the ValueError callers expect. This is
+        # check-then-UPDATE, so a concurrent rename can still slip past it: uq_user_tag_name is
+        # the real guard, and the router maps its IntegrityError to the same 409.
+        existing_tag_with_new_name = get_tag_by_name(db, name=update_data["name"], user_id=user_id)
+        if existing_tag_with_new_name and existing_tag_with_new_name.id != tag_id:
+            raise ValueError("Another tag with this name already exists for this user.")
+    db_tag = _update_returning(db, models.Tag, update_data, models.Tag.id == tag_id, models.Tag.user_id == user_id)
+    if db_tag is not None:
+        _invalidate_tag_cache(user_id)
     return db_tag
 
+def delete_tag(db: Session, tag_id: int, user_id: int) -> Optional[int]:
+    # Ownership is part of the DELETE's WHERE clause
+    deleted_id = _delete_returning_id(db, models.Tag, models.Tag.id == tag_id, models.Tag.user_id == user_id)
+    if deleted_id is not None:
+        _invalidate_tag_cache(user_id)
+    return deleted_id
+
 # --- TaskTag Association CRUD ---
-def add_tag_to_task(db: Session, task_id: int, tag_id: int, user_id: int) -> Optional[models.Task]:
-    db_task = get_task(db, task_id, user_id=user_id) # Check ownership of task
-    db_tag = get_tag(db, tag_id=tag_id, user_id=user_id) # Check ownership of tag, and that it exists for this user
-    if db_task and db_tag:
-        if db_tag not in db_task.tags: # Avoid duplicates
-            db_task.tags.append(db_tag)
-            db.commit()
-            db.refresh(db_task)
-        return db_task
-    return None
+def _insert_task_tag_ignore_duplicate(db: Session, task_id: int, tag_id: int) -> bool:
+    # Writes the association row directly instead of loading Task.tags for a membership test.
+    # Returns True if a row was inserted, False if the link already existed.
+    values = {"task_id": task_id, "tag_id": tag_id}
+    dialect_insert = _on_conflict_insert(db)
+    if dialect_insert is not None:
+        stmt = dialect_insert(models.task_tag_association).values(**values).on_conflict_do_nothing(index_elements=["task_id", "tag_id"])
+        return db.execute(stmt).rowcount > 0
+    already_linked = db.query(literal(True)).filter(
+        exists().where(
+            models.task_tag_association.c.task_id == task_id,
+            models.task_tag_association.c.tag_id == tag_id,
+        )
+    ).scalar()
+    if already_linked:
+        return False
+    db.execute(insert(models.task_tag_association).values(**values))
+    return True
+
+def _user_owns_task_and_tag(db: Session, task_id: int, tag_id: int, user_id: int) -> bool:
+    row = db.execute(_USER_OWNS_TASK_AND_TAG, {"task_id": task_id, "tag_id": tag_id, "user_id": user_id}).first()
+    return row is not None
+
+def _expire_tag_link(db: Session, task_id: int, tag_id: int) -> None:
+    # task_tags is written with Core statements, so loaded Task.tags / Tag.tasks don't see the change.
+    _expire_loaded(db, models.Task, [task_id], ["tags"])
+    _expire_loaded(db, models.Tag, [tag_id], ["tasks"])
+
+def add_tag_to_task(db: Session, task_id: int, tag_id: int, user_id: int, *, refresh: bool = False) -> Tuple[Optional[models.Task], bool]:
+    """
+    Links a tag to a task. Returns (task, already_existed); task is None if either the task or the tag
+    is not accessible to the user. Commits only when a link was actually added; pass refresh=True to
+    reload the task's attributes eagerly instead of on first access.
+    """
+    if not _user_owns_task_and_tag(db, task_id, tag_id, user_id): # Both must exist and belong to the user
+        return None, False
+    added = _insert_task_tag_ignore_duplicate(db, task_id, tag_id) # Duplicates are a no-op
+    if added:
+        db.commit()
+        _expire_tag_link(db, task_id, tag_id) # The returned task re-reads its tags
+    db_task = db.get(models.Task, task_id)
+    if refresh:
+        db.refresh(db_task)
+    return db_task, not added
 
 def remove_tag_from_task(db: Session, task_id: int, tag_id: int, user_id: int) -> Optional[models.Task]:
-    db_task = get_task(db, task_id, user_id=user_id) # Check ownership of task
-    db_tag = get_tag(db, tag_id=tag_id, user_id=user_id) # Check ownership of tag
-    if db_task and db_tag:
-        if db_tag in db_task.tags:
-            db_task.tags.remove(db_tag)
-            db.commit()
-            db.refresh(db_task)
-        return db_task
-    return None
+    if not _user_owns_task_and_tag(db, task_id, tag_id, user_id): # Both must exist and belong to the user
+        return None
+    result = db.execute(
+        delete(models.task_tag_association).where(
+            models.task_tag_association.c.task_id == task_id,
+            models.task_tag_association.c.tag_id == tag_id,
+        )
+    )
+    if result.rowcount:
+        db.commit()
+        _expire_tag_link(db, task_id, tag_id)
+    return db.get(models.Task, task_id)
 
 def get_tags_for_task(db: Session, task_id: int, user_id: int) -> List[models.Tag]:
-    db_task = get_task(db, task_id, user_id=user_id) # Check ownership
-    if db_task:
-        return db_task.tags
-    return []
+    # Tags straight off the association table; the Task row itself is never loaded,
+    # only joined through to its Project for the ownership check.
+    link = models.task_tag_association
+    stmt = (
+        select(models.Tag)
+        .join(link, link.c.tag_id == models.Tag.id)
+        .join(models.Task, models.Task.id == link.c.task_id)
+        .join(models.Project, models.Project.id == models.Task.project_id)
+        .where(link.c.task_id == task_id, models.Project.owner_id == user_id)
+    )
+    return list(db.scalars(stmt))
 
 # --- FocusSession CRUD operations ---
-def get_focus_session(db: Session, session_id: int, user_id: int) -> Optional[models.FocusSession]:
-    return db.query(models.FocusSession).filter(
-        models.FocusSession.id == session_id,
-        models.FocusSession.user_id == user_id
+def _row_version(db: Session, model: Type[ModelType], row_id: int, user_id: int) -> Optional[Tuple[int]]:
+    # One-column SELECT of the version counter for an owned row: enough for a conditional GET to
+    # answer 304 without loading the entity. None means the row is missing or not the user's.
+    return db.execute(
+        select(model.version).where(model.id == row_id, model.user_id == user_id)
     ).first()
 
+def get_focus_session_version(db: Session, session_id: int, user_id: int) -> Optional[Tuple[int]]:
+    return _row_version(db, models.FocusSession, session_id, user_id)
+
+def get_focus_session(db: Session, session_id: int, user_id: int) -> Optional[models.FocusSession]:
+    db_session = db.get(models.FocusSession, session_id)
+    return db_session if db_session is not None and db_session.user_id == user_id else None
+
 def get_focus_sessions(
     db: Session,
     user_id: int,
@@ -354,27 +864,45 @@ def get_focus_sessions(
     start_time_after: Optional[datetime.datetime] = None,
     start_time_before: Optional[datetime.datetime] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[SeekCursor] = None, # Prefer over skip for deep pages: (start_time, id) of the last row seen
 ) -> List[models.FocusSession]:
-    query = db.query(models.FocusSession).filter(models.FocusSession.user_id == user_id)
+    stmt = select(models.FocusSession).where(models.FocusSession.user_id == user_id)
     if task_id is not None:
-        query = query.filter(models.FocusSession.task_id == task_id)
+        stmt = stmt.where(models.FocusSession.task_id == task_id)
     if status is not None: # status is schemas.FocusSessionStatus
         # Convert the schema enum's value to the model's enum member for filtering
         model_status_enum = models.FocusSessionStatus(status.value)
-        query = query.filter(models.FocusSession.status == model_status_enum)
+        stmt = stmt.where(models.FocusSession.status == model_status_enum)
+    if start_time_after is not None:
+        stmt = stmt.where(models.FocusSession.start_time >= start_time_after)
+    if start_time_before is not None:
+        stmt = stmt.where(models.FocusSession.start_time <= start_time_before)
+    stmt = _seek_desc(stmt, models.FocusSession.start_time, models.FocusSession.id, after)
+    return list(db.scalars(stmt.offset(skip).limit(limit)))
+
+def iter_focus_sessions(
+    db: Session,
+    user_id: int,
+    start_time_after: Optional[datetime.datetime] = None,
+    start_time_before: Optional[datetime.datetime] = None,
+    chunk: int = 500,
+) -> Iterator[models.FocusSession]:
+    """ Streams a user's focus sessions (newest first) in chunks of `chunk` rows. """
+    stmt = select(models.FocusSession).where(models.FocusSession.user_id == user_id)
     if start_time_after is not None:
-        query = query.filter(models.FocusSession.start_time >= start_time_after)
+        stmt = stmt.where(models.FocusSession.start_time >= start_time_after)
     if start_time_before is not None:
-        query = query.filter(models.FocusSession.start_time <= start_time_before)
-    return query.order_by(models.FocusSession.start_time.desc()).offset(skip).limit(limit).all()
+        stmt = stmt.where(models.FocusSession.start_time <= start_time_before)
+    stmt = stmt.order_by(models.FocusSession.start_time.desc(), models.FocusSession.id.desc())
+    yield from db.scalars(stmt.execution_options(stream_results=True, yield_per=chunk))
 
-def create_focus_session(db: Session, session_create: schemas.FocusSessionCreate, user_id: int) -> models.FocusSession:
-    db_session_data = session_create.dict(exclude={'duration_minutes'})
+def create_focus_session(db: Session, session_create: schemas.FocusSessionCreate, user_id: int, commit: bool = True) -> models.FocusSession:
+    db_session_data = session_create.model_dump(exclude={'duration_minutes'})
     # Convert Pydantic enum value (which is already the .value) to the model's enum type
     if db_session_data.get("status") is not None:
         try:
-            # Pydantic schema FocusSessionStatus is (str, enum.Enum), so .dict() gives the string value.
+            # Pydantic schema FocusSessionStatus is (str, enum.Enum), so .model_dump() gives the string value.
             status_value = db_session_data["status"]
             db_session_data["status"] = models.FocusSessionStatus(status_value) # Use model's enum
         except ValueError: # Handle case where the value might not be valid for the model's enum
@@ -382,12 +910,14 @@ def create_focus_session(db: Session, session_create: schemas.FocusSessionCreate
 
     db_session_obj = models.FocusSession(**db_session_data, user_id=user_id)
     db.add(db_session_obj)
-    db.commit()
-    db.refresh(db_session_obj) # Corrected variable name
-    return db_session_obj     # Corrected variable name
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    return db_session_obj
 
 def update_focus_session(db: Session, db_session: models.FocusSession, session_update: schemas.FocusSessionUpdate) -> models.FocusSession:
-    update_data_dict = session_update.dict(exclude_unset=True)
+    update_data_dict = session_update.model_dump(exclude_unset=True)
     if "status" in update_data_dict and update_data_dict["status"] is not None:
         try:
             status_value = update_data_dict["status"]
@@ -396,31 +926,18 @@ def update_focus_session(db: Session, db_session: models.FocusSession, session_u
         except ValueError:
              raise ValueError(f"Invalid status value for update: {status_value}")
 
-    # Re-create a Pydantic model from the modified dict to pass to update_db_object
-    # This is a bit indirect; a more direct approach might involve modifying update_db_object
-    # or setattr directly here for enum fields. For now, let's try this.
-    # Alternative: setattr directly for enum, and pass rest to update_db_object.
-    for key, value in update_data_dict.items():
-        setattr(db_session, key, value)
+    return update_db_object(db, db_session, update_data_dict)
 
-    # db_session = update_db_object(db_session, schemas.FocusSessionUpdate(**update_data_dict)) # This would re-validate if needed
-    db.commit()
-    db.refresh(db_session)
-    return db_session
-
-def delete_focus_session(db: Session, session_id: int, user_id: int) -> Optional[models.FocusSession]:
-    db_session = get_focus_session(db, session_id, user_id)
-    if db_session:
-        db.delete(db_session)
-        db.commit()
-    return db_session
+def delete_focus_session(db: Session, session_id: int, user_id: int) -> Optional[int]:
+    return _delete_returning_id(db, models.FocusSession, models.FocusSession.id == session_id, models.FocusSession.user_id == user_id)
 
 # --- EnergyLog CRUD operations ---
+def get_energy_log_version(db: Session, log_id: int, user_id: int) -> Optional[Tuple[int]]:
+    return _row_version(db, models.EnergyLog, log_id, user_id)
+
 def get_energy_log(db: Session, log_id: int, user_id: int) -> Optional[models.EnergyLog]:
-    return db.query(models.EnergyLog).filter(
-        models.EnergyLog.id == log_id,
-        models.EnergyLog.user_id == user_id
-    ).first()
+    db_log = db.get(models.EnergyLog, log_id)
+    return db_log if db_log is not None and db_log.user_id == user_id else None
 
 def get_energy_logs(
     db: Session,
@@ -429,59 +946,139 @@ def get_energy_logs(
     timestamp_after: Optional[datetime.datetime] = None,
     timestamp_before: Optional[datetime.datetime] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[SeekCursor] = None, # Prefer over skip for deep pages: (timestamp, id) of the last row seen
 ) -> List[models.EnergyLog]:
-    query = db.query(models.EnergyLog).filter(models.EnergyLog.user_id == user_id)
+    stmt = select(models.EnergyLog).where(models.EnergyLog.user_id == user_id)
     if energy_level is not None: # energy_level is schemas.EnergyLevel
         # Convert the schema enum's value to the model's enum member for filtering
         model_energy_level_enum = models.EnergyLevel(energy_level.value)
-        query = query.filter(models.EnergyLog.energy_level == model_energy_level_enum)
+        stmt = stmt.where(models.EnergyLog.energy_level == model_energy_level_enum)
     if timestamp_after is not None:
-        query = query.filter(models.EnergyLog.timestamp >= timestamp_after)
+        stmt = stmt.where(models.EnergyLog.timestamp >= timestamp_after)
     if timestamp_before is not None:
-        query = query.filter(models.EnergyLog.timestamp <= timestamp_before)
-    return query.order_by(models.EnergyLog.timestamp.desc()).offset(skip).limit(limit).all()
+        stmt = stmt.where(models.EnergyLog.timestamp <= timestamp_before)
+    stmt = _seek_desc(stmt, models.EnergyLog.timestamp, models.EnergyLog.id, after)
+    return list(db.scalars(stmt.offset(skip).limit(limit)))
 
-def create_energy_log(db: Session, log_create: schemas.EnergyLogCreate, user_id: int) -> models.EnergyLog:
-    db_log_data = log_create.dict(exclude={'source'})
+def iter_energy_logs(
+    db: Session,
+    user_id: int,
+    timestamp_after: Optional[datetime.datetime] = None,
+    timestamp_before: Optional[datetime.datetime] = None,
+    chunk: int = 1000,
+) -> Iterator[models.EnergyLog]:
+    """ Streams a user's energy logs (newest first) in chunks of `chunk` rows. """
+    stmt = select(models.EnergyLog).where(models.EnergyLog.user_id == user_id)
+    if timestamp_after is not None:
+        stmt = stmt.where(models.EnergyLog.timestamp >= timestamp_after)
+    if timestamp_before is not None:
+        stmt = stmt.where(models.EnergyLog.timestamp <= timestamp_before)
+    stmt = stmt.order_by(models.EnergyLog.timestamp.desc(), models.EnergyLog.id.desc())
+    yield from db.scalars(stmt.execution_options(stream_results=True, yield_per=chunk))
+
+def get_energy_series(
+    db: Session,
+    user_id: int,
+    timestamp_after: Optional[datetime.datetime] = None,
+    timestamp_before: Optional[datetime.datetime] = None,
+) -> List[Tuple[datetime.datetime, models.EnergyLevel]]:
+    """ (timestamp, energy_level) pairs, oldest first, for report aggregation; no ORM rows are built. """
+    stmt = select(models.EnergyLog.timestamp, models.EnergyLog.energy_level).where(models.EnergyLog.user_id == user_id)
+    if timestamp_after is not None:
+        stmt = stmt.where(models.EnergyLog.timestamp >= timestamp_after)
+    if timestamp_before is not None:
+        stmt = stmt.where(models.EnergyLog.timestamp <= timestamp_before)
+    return [tuple(row) for row in db.execute(stmt.order_by(models.EnergyLog.timestamp, models.EnergyLog.id))]
+
+def _build_energy_log(log_create: schemas.EnergyLogCreate, user_id: int) -> models.EnergyLog:
+    db_log_data = log_create.model_dump(exclude={'source'})
     # Convert Pydantic enum value (which is already the .value) to the model's enum type
     if db_log_data.get("energy_level") is not None:
         try:
-            # Pydantic schema EnergyLevel is (int, enum.Enum), so .dict() gives the int value.
+            # Pydantic schema EnergyLevel is (int, enum.Enum), so .model_dump() gives the int value.
             energy_level_value = db_log_data["energy_level"]
             db_log_data["energy_level"] = models.EnergyLevel(energy_level_value) # Use model's enum
         except ValueError: # Handle case where the value might not be valid for the model's enum
             raise ValueError(f"Invalid energy_level value: {energy_level_value}")
 
-    db_log = models.EnergyLog(**db_log_data, user_id=user_id)
+    return models.EnergyLog(**db_log_data, user_id=user_id)
+
+def create_energy_log(db: Session, log_create: schemas.EnergyLogCreate, user_id: int, commit: bool = True) -> models.EnergyLog:
+    db_log = _build_energy_log(log_create, user_id)
     db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     return db_log
 
-def update_energy_log(db: Session, db_log: models.EnergyLog, log_update: schemas.EnergyLogUpdate) -> models.EnergyLog:
-    update_data_dict = log_update.dict(exclude_unset=True)
+def create_energy_logs_bulk(db: Session, logs_create: List[schemas.EnergyLogCreate], user_id: int, batch_size: int = BULK_BATCH_SIZE, commit: bool = True) -> int:
+    """ Inserts many energy logs for a user with batched flushes and a single commit. """
+    return _save_in_batches(db, (_build_energy_log(l, user_id) for l in logs_create), batch_size=batch_size, commit=commit)
+
+_ENERGY_LOG_COPY_COLUMNS = ("user_id", "timestamp", "energy_level", "notes") # created_at/updated_at use the server defaults
+
+def copy_energy_logs(db: Session, logs_create: List[schemas.EnergyLogCreate], user_id: int, commit: bool = True) -> int:
+    """
+    Large energy log ingest. On PostgreSQL the rows are streamed with COPY ... FROM STDIN,
+    bypassing per-row INSERT parsing; other dialects fall back to create_energy_logs_bulk.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return create_energy_logs_bulk(db, logs_create, user_id=user_id, commit=commit)
+
+    now = models.utcnow()
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    count = 0
+    for log_create in logs_create:
+        db_log = _build_energy_log(log_create, user_id)
+        writer.writerow((
+            user_id,
+            (db_log.timestamp or now).isoformat(),
+            db_log.energy_level.value, # energy_level is stored as the level's SMALLINT value
+            db_log.notes if db_log.notes is not None else "",
+        ))
+        count += 1
+    if not count:
+        return 0
+    buf.seek(0)
+
+    # Raw DBAPI cursor on the session's own connection so COPY joins the current transaction.
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY energy_logs ({', '.join(_ENERGY_LOG_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buf,
+        )
+    finally:
+        cursor.close()
+    if commit:
+        db.commit()
+    return count
+
+def _energy_log_update_values(log_update: schemas.EnergyLogUpdate) -> dict:
+    update_data_dict = log_update.model_dump(exclude_unset=True)
     if "energy_level" in update_data_dict and update_data_dict["energy_level"] is not None:
         try:
             energy_level_value = update_data_dict["energy_level"]
             update_data_dict["energy_level"] = models.EnergyLevel(energy_level_value)
         except ValueError:
             raise ValueError(f"Invalid energy_level value for update: {energy_level_value}")
+    return update_data_dict
 
-    for key, value in update_data_dict.items():
-        setattr(db_log, key, value)
+def update_energy_log(db: Session, db_log: models.EnergyLog, log_update: schemas.EnergyLogUpdate) -> models.EnergyLog:
+    return update_db_object(db, db_log, _energy_log_update_values(log_update))
 
-    # db_log = update_db_object(db_log, schemas.EnergyLogUpdate(**update_data_dict))
-    db.commit()
-    db.refresh(db_log)
-    return db_log
+def update_energy_log_by_id(db: Session, log_id: int, user_id: int, log_update: schemas.EnergyLogUpdate) -> Optional[models.EnergyLog]:
+    """ Updates the user's energy log in one UPDATE ... RETURNING; None if it doesn't exist or isn't theirs. """
+    values = _energy_log_update_values(log_update)
+    if not values:
+        return get_energy_log(db, log_id=log_id, user_id=user_id)
+    return _update_returning(db, models.EnergyLog, values, models.EnergyLog.id == log_id, models.EnergyLog.user_id == user_id)
 
-def delete_energy_log(db: Session, log_id: int, user_id: int) -> Optional[models.EnergyLog]:
-    db_log = get_energy_log(db, log_id, user_id)
-    if db_log:
-        db.delete(db_log)
-        db.commit()
-    return db_log
+def delete_energy_log(db: Session, log_id: int, user_id: int) -> Optional[int]:
+    return _delete_returning_id(db, models.EnergyLog, models.EnergyLog.id == log_id, models.EnergyLog.user_id == user_id)
 
 # Note: 'user_id' parameters in get/delete functions are for authorization context.
 # The actual filtering by user_id for ownership is applied where necessary (e.g. Project, FocusSession, EnergyLog).
@@ -497,9 +1094,9 @@ def delete_energy_log(db: Session, log_id: int, user_id: int) -> Optional[models
 # Delete operations also consider `user_id` for authorization.
 # TaskTag operations (`add_tag_to_task`, `remove_tag_from_task`, `get_tags_for_task`) check task ownership via `user_id`.
 # The `and_` import from sqlalchemy is available if complex filter conditions were needed, though not explicitly used in this revision.
-# `datetime.datetime.utcnow()` used for `updated_at` in `update_password`.
+# `updated_at` for users is stamped by the database on UPDATE (`onupdate=func.now()`).
 # `get_tasks` now sorts by priority (desc), due_date (asc), then creation_date (asc) as a sensible default.
-# `create_task` uses `task_create.dict(exclude={"project_id", "assignee_id"})` if these are passed as separate arguments to avoid conflicts.
+# `create_task` uses `task_create.model_dump(exclude={"project_id", "assignee_id"})` if these are passed as separate arguments to avoid conflicts.
 # This comprehensive set of CRUD functions should cover the requirements based on the models and schemas.
 # Further refinements (e.g., more complex filtering, specific business logic) would be added as needed.
 # `delete_project` now explicitly takes `user_id` to ensure the deleter owns the project.
@@ -19,24 +19,44 @@ def get_db():
 # The tokenUrl should point to your token generation endpoint, typically prefixed with /api
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> models.User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def _token_username(token: str) -> str:
     token_data = decode_access_token(token) # decode_access_token now returns schemas.TokenData or None
     if token_data is None or token_data.username is None:
         raise credentials_exception
+    return token_data.username
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> crud.UserPrincipal:
+    # Only id / username / is_active, cached briefly per process: enough for routes that just scope by user.
+    principal = crud.get_user_principal(db, username=_token_username(token))
+    if principal is None:
+        raise credentials_exception
+    return principal
 
-    user = crud.get_user_by_username(db, username=token_data.username)
+def get_current_active_principal(
+    current_user: crud.UserPrincipal = Depends(get_current_principal)
+) -> crud.UserPrincipal:
+    if not current_user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return current_user
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> models.User:
+    # Full ORM row, for the /users/me routes that read or modify the user itself.
+    user = crud.get_user_by_username(db, username=_token_username(token))
     if user is None:
         raise credentials_exception
     return user
 
-async def get_current_active_user(
+def get_current_active_user(
     current_user: models.User = Depends(get_current_user)
 ) -> models.User:
     if not current_user.is_active: # Ensure user is active
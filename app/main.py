@@ -1,23 +1,34 @@
 # FastAPI application entry point
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
 from app.routers import auth, users, projects, tasks, tags # Removed focus_sessions, energy_logs, ai, monitoring
-from app.database import engine, Base
-# Ensure all models are imported for table creation, even if their routers are not present yet.
-# This is important if Base.metadata.create_all() is to create these tables.
-from app.models import User, Project, Task, Tag, FocusSession, EnergyLog
+from app.core.config import settings
+from app.database import create_db_and_tables
 
-# Create database tables if they don't exist
-# In a production app, you might use Alembic for migrations.
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables if they don't exist. This runs at startup rather than at import,
+    # so `import app.main` needs no database; deployments that manage the schema with
+    # migrations set RUN_DDL_ON_STARTUP=false.
+    if settings.RUN_DDL_ON_STARTUP:
+        await run_in_threadpool(create_db_and_tables)
+    yield
 
 app = FastAPI(
     title="ZenithTask API",
     description="API for ZenithTask - a smart task and project management application with AI features.",
     version="0.1.0",
+    lifespan=lifespan,
     # You can add more metadata like contact, license_info, etc.
     # openapi_tags can be used to group endpoints in the docs
 )
 
+# List, export and report responses are repetitive JSON (field names, ISO timestamps) that
+# compresses several-fold; small single-object bodies are sent as-is.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
@@ -1,14 +1,21 @@
 # SQLAlchemy models for database tables
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table, REAL, JSON, Enum, Float, UniqueConstraint
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, DateTime, ForeignKey, Table, REAL, JSON, Enum, Float, UniqueConstraint, Index
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func, literal_column
 from .database import Base
 import datetime
 import enum
 
+def utcnow() -> datetime.datetime:
+    """ Current UTC time as a naive datetime; the DateTime columns here are timezone-naive and hold UTC. """
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
 # Association table for many-to-many relationship between Tasks and Tags
 task_tag_association = Table('task_tags', Base.metadata,
-    Column('task_id', Integer, ForeignKey('tasks.id'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True)
+    Column('task_id', Integer, ForeignKey('tasks.id', ondelete="CASCADE"), primary_key=True),
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete="CASCADE"), primary_key=True)
 )
 
 class User(Base):
@@ -19,15 +26,24 @@ class User(Base):
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
-    preferences = Column(JSON, nullable=True) # Added user preferences field
+    # Timestamps are stamped by the database on INSERT/UPDATE (returned via eager_defaults), not by
+    # Python, so the same defaults apply to Core bulk inserts and COPY. The same pattern is used below.
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Stored as binary JSONB on PostgreSQL (parsed once on write, not on every read); plain JSON elsewhere.
+    preferences = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True) # Added user preferences field
+
+    # Child rows are removed (or unlinked) by ON DELETE rules in the database; passive_deletes
+    # stops the ORM from loading each collection just to delete or null it row by row.
+    projects = relationship("Project", back_populates="owner", passive_deletes=True)
+    tasks = relationship("Task", back_populates="assignee", passive_deletes=True, lazy="raise_on_sql") # If tasks can be directly assigned to users
+    focus_sessions = relationship("FocusSession", back_populates="user", passive_deletes=True, lazy="raise_on_sql")
+    energy_logs = relationship("EnergyLog", back_populates="user", passive_deletes=True, lazy="raise_on_sql")
+    tags = relationship("Tag", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql") # User's own tags
 
-    projects = relationship("Project", back_populates="owner")
-    tasks = relationship("Task", back_populates="assignee") # If tasks can be directly assigned to users
-    focus_sessions = relationship("FocusSession", back_populates="user")
-    energy_logs = relationship("EnergyLog", back_populates="user")
-    tags = relationship("Tag", back_populates="owner", cascade="all, delete-orphan") # User's own tags
+    # Covers crud.get_user_principal (id, username, is_active by username), the lookup behind every
+    # authenticated request, as an index-only scan. On SQLite the rowid (id) is in every index anyway.
+    __table_args__ = (Index("ix_users_principal", "username", "is_active", postgresql_include=["id"]),)
 
 class Project(Base):
     __tablename__ = "projects"
@@ -35,38 +51,42 @@ class Project(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), index=True, nullable=False)
     description = Column(String(500))
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     is_archived = Column(Boolean, default=False, nullable=False)
     archived_at = Column(DateTime, nullable=True)
 
-    owner = relationship("User", back_populates="projects")
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    owner = relationship("User", back_populates="projects", lazy="raise_on_sql")
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+
+    # get_projects_by_user (+ archived filter): trailing id serves its ORDER BY id / id > after_id
+    # keyset page as an ordered index range scan, with no sort step.
+    __table_args__ = (Index("ix_project_owner_archived", "owner_id", "is_archived", "id"),)
 
 class Task(Base):
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(200), index=True, nullable=False)
+    title = Column(String(200), nullable=False)
     description = Column(String(1000))
     completed = Column(Boolean, default=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True) # Optional: if tasks are assigned
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    assignee_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True) # Optional: if tasks are assigned
     due_date = Column(DateTime, nullable=True)
     priority = Column(Integer, default=0) # Example: 0=Low, 1=Medium, 2=High
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
-    project = relationship("Project", back_populates="tasks")
-    assignee = relationship("User", back_populates="tasks") # If tasks can be assigned
-    tags = relationship("Tag", secondary=task_tag_association, back_populates="tasks")
-    focus_sessions = relationship("FocusSession", back_populates="task")
+    project = relationship("Project", back_populates="tasks", lazy="raise_on_sql")
+    assignee = relationship("User", back_populates="tasks", lazy="raise_on_sql") # If tasks can be assigned
+    tags = relationship("Tag", secondary=task_tag_association, back_populates="tasks", passive_deletes=True)
+    focus_sessions = relationship("FocusSession", back_populates="task", passive_deletes=True, lazy="raise_on_sql")
 
     # Fields for subtasks and ordering
-    parent_task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
-    parent = relationship("Task", back_populates="sub_tasks", remote_side=[id]) # For parent task
-    sub_tasks = relationship("Task", back_populates="parent", cascade="all, delete-orphan") # For list of sub_tasks
+    parent_task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True)
+    parent = relationship("Task", back_populates="sub_tasks", remote_side=[id], lazy="raise_on_sql") # For parent task
+    sub_tasks = relationship("Task", back_populates="parent", cascade="all, delete-orphan", passive_deletes=True) # For list of sub_tasks
 
     order_in_list = Column(Float, nullable=True) # For custom sorting
 
@@ -74,19 +94,30 @@ class Task(Base):
     is_recurring = Column(Boolean, default=False, nullable=False)
     recurring_schedule = Column(String, nullable=True) # E.g., RRULE string or cron expression
 
+    # Mirrors crud.get_tasks: equality filters on project_id/completed, then its ORDER BY keys,
+    # so a project's task list can be read as an index range scan without a separate sort.
+    __table_args__ = (
+        Index("ix_task_owner_sort", "project_id", "completed", "order_in_list", "priority", "due_date", "created_at"),
+        # Same ORDER BY when the list is not filtered on completed.
+        Index("ix_task_project_order", "project_id", "order_in_list", "priority", "due_date"),
+        # Due-date windows (due_date_before/after) within a project, e.g. "open tasks due this week".
+        Index("ix_task_project_completed_due", "project_id", "completed", "due_date"),
+    )
+
 
 class Tag(Base):
     __tablename__ = "tags"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(50), index=True, nullable=False) # Removed unique=True here
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True) # Added user_id
+    name = Column(String(50), nullable=False) # Removed unique=True here
+    # Lookups by user_id and by (user_id, name) both use the uq_user_tag_name index below.
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False) # Added user_id
     color = Column(String(7), nullable=True) # E.g., '#RRGGBB'
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
-    owner = relationship("User", back_populates="tags") # Added relationship to User
-    tasks = relationship("Task", secondary=task_tag_association, back_populates="tags")
+    owner = relationship("User", back_populates="tags", lazy="raise_on_sql") # Added relationship to User
+    tasks = relationship("Task", secondary=task_tag_association, back_populates="tags", passive_deletes=True, lazy="raise_on_sql")
 
     __table_args__ = (UniqueConstraint('user_id', 'name', name='uq_user_tag_name'),) # Added unique constraint for user_id and name
 
@@ -100,21 +131,65 @@ class FocusSessionStatus(enum.Enum):
     COMPLETED = "completed"
     CANCELLED = "cancelled"
 
+# Storage codes for enums whose values aren't already small integers. Codes are persisted,
+# so existing entries must never be renumbered; new members get new codes.
+_ENUM_CODES = {
+    FocusSessionStatus: {
+        FocusSessionStatus.ACTIVE: 1,
+        FocusSessionStatus.PAUSED: 2,
+        FocusSessionStatus.COMPLETED: 3,
+        FocusSessionStatus.CANCELLED: 4,
+    },
+}
+
+class SmallIntEnum(TypeDecorator):
+    """
+    Python enum stored as a SMALLINT code instead of a VARCHAR (+ CHECK) column.
+    Uses the codes in _ENUM_CODES, or the members' own integer values.
+    Binds accept a member or a member value; results load as members.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class):
+        super().__init__()
+        self.enum_class = enum_class
+        self._to_code = _ENUM_CODES.get(enum_class) or {member: member.value for member in enum_class}
+        self._from_code = {code: member for member, code in self._to_code.items()}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._to_code[value if isinstance(value, self.enum_class) else self.enum_class(value)]
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self._from_code[value]
+
 class FocusSession(Base):
     __tablename__ = "focus_sessions"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True) # Can be null if session is not for a specific task
-    start_time = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True) # Can be null if session is not for a specific task
+    start_time = Column(DateTime, default=utcnow, nullable=False)
     end_time = Column(DateTime, nullable=True)
-    status = Column(Enum(FocusSessionStatus), default=FocusSessionStatus.ACTIVE, nullable=False)
+    status = Column(SmallIntEnum(FocusSessionStatus), default=FocusSessionStatus.ACTIVE, nullable=False)
     # duration_minutes = Column(Integer, nullable=True) # Can be calculated or stored
     notes = Column(String(500), nullable=True)
     # pomo_cycle_count = Column(Integer, default=0) # If using Pomodoro technique
+    created_at = Column(DateTime, server_default=func.now()) # Part of the schemas.FocusSession response
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Incremented by every UPDATE; the conditional-GET ETag uses it because updated_at may only
+    # have second resolution (SQLite CURRENT_TIMESTAMP), so two writes in one second look alike.
+    # An onupdate expression rather than mapper version_id_col: the crud helpers write with
+    # UPDATE ... RETURNING statements, which version_id_col does not bump. Existing databases
+    # gain the column via database._ADDED_COLUMNS.
+    version = Column(Integer, default=1, server_default="1", onupdate=literal_column("version") + 1, nullable=False)
 
-    user = relationship("User", back_populates="focus_sessions")
-    task = relationship("Task", back_populates="focus_sessions")
+    user = relationship("User", back_populates="focus_sessions", lazy="raise_on_sql")
+    task = relationship("Task", back_populates="focus_sessions", lazy="raise_on_sql")
+
+    __table_args__ = (Index("ix_focus_user_time", "user_id", "start_time"),) # Per-user listing ordered by start_time
 
 class EnergyLevel(enum.Enum):
     VERY_LOW = 1
@@ -127,15 +202,18 @@ class EnergyLog(Base):
     __tablename__ = "energy_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    timestamp = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
-    energy_level = Column(Enum(EnergyLevel), nullable=False) # Using REAL to store numeric energy level, or Integer
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    timestamp = Column(DateTime, default=utcnow, nullable=False)
+    energy_level = Column(SmallIntEnum(EnergyLevel), nullable=False) # Stored as the level's 1-5 value
     notes = Column(String(500), nullable=True) # Optional notes about the energy level
     # mood = Column(String(50), nullable=True) # Optional: track mood alongside energy
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    version = Column(Integer, default=1, server_default="1", onupdate=literal_column("version") + 1, nullable=False) # See FocusSession.version
+
+    user = relationship("User", back_populates="energy_logs", lazy="raise_on_sql")
 
-    user = relationship("User", back_populates="energy_logs")
+    __table_args__ = (Index("ix_energy_user_time", "user_id", "timestamp"),) # Per-user listing / time-range reports
 
 # Ensure all relationships are correctly defined and back_populates match.
 # String lengths are examples and can be adjusted.
@@ -1,34 +1,63 @@
 # AI services router
+"""
+Dummy AI endpoints. app.main does not mount this router at the moment, so the response cache
+and model_construct() fast paths below are dormant until it is included again; the tests call
+the handlers directly.
+"""
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Optional, Dict, Any # Ensure Any is imported if used in dummy responses
-from datetime import date, time, datetime # For dummy response data types
+from datetime import date, time, datetime, timedelta # For dummy response data types
+from functools import wraps
+from itertools import accumulate
+from cachetools import TTLCache
 
-from ..dependencies import get_current_active_user
-from .. import schemas # Import the new schemas
+from ..dependencies import get_current_active_principal
+from .. import crud, schemas # Import the new schemas
 
 router = APIRouter(
     prefix="/ai",
     tags=["ai"],
-    dependencies=[Depends(get_current_active_user)], # Secure all AI endpoints in this router
+    dependencies=[Depends(get_current_active_principal)], # Secure all AI endpoints in this router
     responses={404: {"description": "Not found"}},
 )
 
 # The old /predict endpoint and its local schemas (AIRequest, AIResponse) are removed.
 
+# Responses here are assembled from validated request data and server-side values, so they are
+# built with model_construct(). FastAPI passes model instances through response_model validation
+# without re-validating them and serializes them straight to JSON with pydantic-core.
+
+# Responses are a pure function of the request body, and identical requests recur, so they are
+# cached per endpoint for five minutes keyed on the user and the body's canonical JSON. The user is
+# part of the key so one user's results are never served to another once real models see user
+# context. Handlers run on the event loop thread, so the cache needs no lock.
+_response_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+
+def _cached_response(handler):
+    @wraps(handler)
+    async def wrapper(request_data, current_user, **kwargs):
+        key = (handler.__name__, current_user.id, request_data.model_dump_json())
+        response = _response_cache.get(key)
+        if response is None:
+            response = _response_cache[key] = await handler(request_data, current_user=current_user, **kwargs)
+        return response
+    return wrapper
+
 @router.post("/decompose-task", response_model=schemas.AIDecomposeTaskResponse)
+@_cached_response
 async def decompose_task(
     request_data: schemas.AIDecomposeTaskRequest,
-    # current_user: schemas.User = Depends(get_current_active_user) # User already injected by router dependency
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal), # Same principal as the router dependency
 ):
     """
     Requests AI to decompose a task into subtasks.
     """
     # Dummy response based on api.md and schemas.py
     dummy_subtasks = [
-        schemas.AISubtask(title="Subtask 1 for " + request_data.task_title, description="Description for subtask 1", estimated_duration_minutes=60, priority=1),
-        schemas.AISubtask(title="Subtask 2 for " + request_data.task_title, description="Description for subtask 2", estimated_duration_minutes=90, priority=0),
+        schemas.AISubtask.model_construct(title="Subtask 1 for " + request_data.task_title, description="Description for subtask 1", estimated_duration_minutes=60, priority=1),
+        schemas.AISubtask.model_construct(title="Subtask 2 for " + request_data.task_title, description="Description for subtask 2", estimated_duration_minutes=90, priority=0),
     ]
-    return schemas.AIDecomposeTaskResponse(
+    return schemas.AIDecomposeTaskResponse.model_construct(
         original_task_id=request_data.task_id,
         original_task_title=request_data.task_title,
         subtasks=dummy_subtasks,
@@ -36,38 +65,36 @@ async def decompose_task(
     )
 
 @router.post("/schedule-day", response_model=schemas.AIScheduleDayResponse)
+@_cached_response
 async def schedule_day(
     request_data: schemas.AIScheduleDayRequest,
-    # current_user: schemas.User = Depends(get_current_active_user)
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal), # Same principal as the router dependency
 ):
     """
     Requests AI to plan a day's schedule.
     """
-    dummy_scheduled_tasks = []
-    current_time = datetime.combine(request_data.date_to_schedule, time(9,0)) # Start at 9 AM for example
+    tasks = request_data.tasks_to_schedule
+    day_start = datetime.combine(request_data.date_to_schedule, time(9,0)) # Start at 9 AM for example
+    # Ensure estimated_duration_minutes has a default if None, for dummy logic
+    durations = [task_info.estimated_duration_minutes or 60 for task_info in tasks]
+    # Start offsets in whole minutes from day_start: back to back, with a 15-minute break after each task.
+    start_offsets = accumulate((duration + 15 for duration in durations[:-1]), initial=0)
 
-    for i, task_info in enumerate(request_data.tasks_to_schedule):
-        start_dt = current_time
-        # Ensure estimated_duration_minutes has a default if None, for dummy logic
-        duration_minutes = task_info.estimated_duration_minutes or 60
-        end_dt = start_dt + datetime.timedelta(minutes=duration_minutes)
-
-        dummy_scheduled_tasks.append(
-            schemas.AIScheduledTask(
-                task_id=task_info.task_id,
-                title=task_info.title,
-                priority=task_info.priority,
-                due_date=task_info.due_date,
-                estimated_duration_minutes=duration_minutes,
-                scheduled_start_time=start_dt,
-                scheduled_end_time=end_dt
-            )
+    construct = schemas.AIScheduledTask.model_construct
+    dummy_scheduled_tasks = [
+        construct(
+            task_id=task_info.task_id,
+            title=task_info.title,
+            priority=task_info.priority,
+            due_date=task_info.due_date,
+            estimated_duration_minutes=duration_minutes,
+            scheduled_start_time=day_start + timedelta(minutes=start),
+            scheduled_end_time=day_start + timedelta(minutes=start + duration_minutes),
         )
-        # Add a small break before next task for dummy scheduling
-        current_time = end_dt + datetime.timedelta(minutes=15)
-
+        for task_info, duration_minutes, start in zip(tasks, durations, start_offsets)
+    ]
 
-    return schemas.AIScheduleDayResponse(
+    return schemas.AIScheduleDayResponse.model_construct(
         date_scheduled=request_data.date_to_schedule,
         scheduled_tasks=dummy_scheduled_tasks,
         warnings=["This is a dummy schedule. Actual scheduling logic may vary."],
@@ -75,9 +102,10 @@ async def schedule_day(
     )
 
 @router.post("/estimate-energy", response_model=schemas.AIEstimateEnergyResponse)
+@_cached_response
 async def estimate_energy(
     request_data: schemas.AIEstimateEnergyRequest,
-    # current_user: schemas.User = Depends(get_current_active_user)
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal), # Same principal as the router dependency
 ):
     """
     Requests AI to estimate energy level required for a task.
@@ -90,7 +118,7 @@ async def estimate_energy(
     elif request_data.task_duration_minutes < 30:
         estimated_level = schemas.EnergyLevel.LOW
 
-    return schemas.AIEstimateEnergyResponse(
+    return schemas.AIEstimateEnergyResponse.model_construct(
         task_description=request_data.task_description,
         estimated_energy_level_required=estimated_level,
         confidence=0.75 # Dummy confidence score
@@ -98,7 +126,7 @@ async def estimate_energy(
 
 # Ensure all necessary schemas are imported and used correctly.
 # Ensure dummy responses align with the structure defined in schemas.py and api.md.
-# The dependency get_current_active_user is applied at the router level,
+# The dependency get_current_active_principal is applied at the router level,
 # so it protects all these endpoints.
 # Datetime objects are used for date/time fields in dummy responses.
 # Removed unused imports like `HTTPException` if not used, but it's fine to keep for future use.
@@ -106,7 +134,7 @@ async def estimate_energy(
 # Added `datetime` from `datetime` for constructing dummy `datetime` objects.
 # Corrected AIScheduledTask instantiation to include all fields from TaskBasicInfo.
 # Ensured `estimated_duration_minutes` in `schedule_day` has a fallback for dummy logic.
-# Corrected import for `datetime.timedelta`.
+# `timedelta` is imported directly (`datetime` here is the class, not the module).
 # Imported `date`, `time` from `datetime`.
 # Added example for `gaps_identified` in `schedule_day` response.
 # Added example for `warnings` in `schedule_day` response.
@@ -7,27 +7,26 @@ from datetime import timedelta
 from .. import crud, schemas, models # models import might not be directly used but good for consistency
 from ..core import security
 from ..dependencies import get_db
-from ..core.config import settings # Import global settings
+from ..core.config import Settings, get_settings
 
 router = APIRouter(
     tags=["authentication"], # Tag for API documentation
 )
 
 @router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-async def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """
     Register a new user.
     - Checks for existing user by email or username.
     - Hashes password before saving.
     """
-    db_user_by_email = crud.get_user_by_email(db, email=user.email)
-    if db_user_by_email:
+    conflict = crud.get_registration_conflict(db, email=user.email, username=user.username)
+    if conflict == "email":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered.",
         )
-    db_user_by_username = crud.get_user_by_username(db, username=user.username)
-    if db_user_by_username:
+    if conflict == "username":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered.",
@@ -36,24 +35,19 @@ async def register_user(user: schemas.UserCreate, db: Session = Depends(get_db))
     return created_user
 
 @router.post("/token", response_model=schemas.Token)
-async def login_for_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+def login_for_access_token(
+    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends(),
+    settings: Settings = Depends(get_settings),
 ):
     """
     Authenticate user and return a JWT access token.
     - Verifies username and password.
     - Creates access token with configured expiration time.
     """
-    # It's good practice to have an `authenticate_user` function in crud.py,
-    # but for now, we directly use get_user_by_username and verify_password.
-    # Attempt to authenticate by username first
-    user = crud.get_user_by_username(db, username=form_data.username)
+    # The 'username' form field may hold either a username or an email.
+    # Hashes stored at an outdated bcrypt cost are upgraded here on successful login.
+    user = crud.authenticate_user(db, username=form_data.username, password=form_data.password)
     if not user:
-        # If not found by username, try by email
-        # This assumes the 'username' field in the form might contain an email
-        user = crud.get_user_by_email(db, email=form_data.username)
-
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -74,23 +68,10 @@ async def login_for_access_token(
 #     # Add token to a blacklist or perform other session invalidation
 #     return {"message": "Successfully logged out"}
 
-# Note on crud.authenticate_user:
-# If you were to implement it, it might look like this in crud.py:
-# def authenticate_user(db: Session, username: str, password: str) -> Optional[models.User]:
-#     user = get_user_by_username(db, username=username)
-#     if not user:
-#         return None
-#     if not security.verify_password(password, user.hashed_password):
-#         return None
-#     return user
-# Then in the /token endpoint:
-# user = crud.authenticate_user(db, username=form_data.username, password=form_data.password)
-# if not user:
-#     # raise HTTPException...
-# This separates concerns better.
-# The current implementation in /token is also functional.
+# /token authenticates through crud.authenticate_user (username or email lookup, password check,
+# and re-hashing of hashes below the configured BCRYPT_ROUNDS).
 # Changed user_create parameter name in crud.create_user call to match definition.
-# Added async to register_user for consistency, though DB calls are sync.
+# register_user and the other handlers are plain `def`: the CRUD layer is synchronous, so FastAPI runs them in its threadpool instead of blocking the event loop.
 # Added docstrings.
 # Used status_code=status.HTTP_201_CREATED for register.
 # Used settings.ACCESS_TOKEN_EXPIRE_MINUTES.
@@ -1,75 +1,171 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Any
+from functools import wraps
 import datetime
+import statistics
+import threading
+from cachetools import TTLCache
 
 from .. import crud, models, schemas
-from ..dependencies import get_current_active_user, get_db
+from ..dependencies import get_current_active_principal, get_db
 
 # Main router for all /api/monitoring endpoints
 monitoring_router = APIRouter(
     prefix="/api/monitoring",
     tags=["monitoring"],
-    dependencies=[Depends(get_current_active_user)],
+    dependencies=[Depends(get_current_active_principal)],
     responses={404: {"description": "Not found"}},
 )
 
+_CURSOR_QUERY = Query(None, description="Keyset pagination: the X-Next-Cursor header value from the previous page.")
+# Pages are materialized in full, so their size is bounded; the /export routes stream the whole set.
+_LIMIT_QUERY = Query(100, ge=1, le=1000, description="Page size (1-1000). Use the /export route to read everything.")
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[crud.SeekCursor]:
+    if cursor is None:
+        return None
+    try:
+        return crud.SeekCursor.decode(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def _cursor_page(rows: list, limit: int, sort_attr: str, response: Response) -> list:
+    # Rows were fetched with limit + 1: an extra row means there is a next page, and its
+    # cursor (the last returned row's position) goes out in the X-Next-Cursor header.
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = crud.SeekCursor(getattr(last, sort_attr), last.id).encode()
+    return rows
+
+def _etag(row_id: int, version: Optional[tuple]) -> Optional[str]:
+    # Weak validator built from the row's version counter, so it is known before the row is loaded.
+    return f'W/"{row_id}-{version[0]}"' if version is not None else None
+
+def _not_modified(request: Request, etag: Optional[str]) -> bool:
+    if etag is None:
+        return False
+    candidates = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+    return etag in candidates or "*" in candidates
+
+# Report responses per user: user_id -> {(report, params): response}. Reports depend only on
+# the user's own data and query parameters, and dashboards re-request them on every refresh.
+# The cache is per process: a write drops the user's entries in the worker that handled it, and
+# the short TTL bounds how long other workers can keep serving a report from before the write.
+_report_cache: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+_report_cache_lock = threading.Lock()
+
+def _invalidate_reports(user_id: int) -> None:
+    with _report_cache_lock:
+        _report_cache.pop(user_id, None)
+
+def _cached_report(handler):
+    @wraps(handler)
+    def wrapper(*, current_user: crud.UserPrincipal, **params):
+        key = (handler.__name__, tuple(sorted((k, v) for k, v in params.items() if k != "db")))
+        with _report_cache_lock:
+            report = _report_cache.get(current_user.id, {}).get(key)
+        if report is None:
+            report = handler(current_user=current_user, **params)
+            with _report_cache_lock:
+                _report_cache.setdefault(current_user.id, {})[key] = report
+        return report
+    return wrapper
+
 # --- Focus Sessions Router ---
 focus_sessions_router = APIRouter(
     prefix="/focus-sessions",
     tags=["focus-sessions"],
 )
 
+# Validated status fields hold the enum member itself, so completion is an identity check
+# rather than str-Enum equality.
+_COMPLETED = schemas.FocusSessionStatus.COMPLETED
+
+def _minutes(delta: datetime.timedelta) -> int:
+    # Whole minutes in a non-negative timedelta, in integer arithmetic (no float round-trip).
+    return (delta.days * 86400 + delta.seconds) // 60
+
 @focus_sessions_router.post("/", response_model=schemas.FocusSession, status_code=status.HTTP_201_CREATED)
 def create_focus_session_endpoint( # Renamed to avoid conflict with schema name
     focus_session_create: schemas.FocusSessionCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
-    # Logic to handle duration/end_time consistency if needed
-    # For example, if start_time and end_time are provided, calculate duration_minutes
-    temp_focus_session_data = focus_session_create.dict()
-    if temp_focus_session_data.get("start_time") and temp_focus_session_data.get("end_time") and temp_focus_session_data.get("duration_minutes") is None:
-        duration_delta = temp_focus_session_data["end_time"] - temp_focus_session_data["start_time"]
-        if duration_delta.total_seconds() < 0:
+    # Derive whichever of end_time / duration_minutes is missing from the other. When both or
+    # neither are sent there is nothing to compute and the validated input goes to crud as-is.
+    start_time = focus_session_create.start_time
+    end_time = focus_session_create.end_time
+    duration_minutes = focus_session_create.duration_minutes
+    final_session_data = focus_session_create
+    if end_time is not None and duration_minutes is None:
+        if end_time < start_time:
              raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_time cannot be before start_time")
-        temp_focus_session_data["duration_minutes"] = int(duration_delta.total_seconds() / 60)
-    elif temp_focus_session_data.get("start_time") and temp_focus_session_data.get("duration_minutes") is not None and temp_focus_session_data.get("end_time") is None:
-        temp_focus_session_data["end_time"] = temp_focus_session_data["start_time"] + datetime.timedelta(minutes=temp_focus_session_data["duration_minutes"])
-
-    # Re-create the schema with potentially updated fields to pass to CRUD
-    # This ensures that the status field with its default value from FocusSessionBase is included.
-    # And any calculated fields (end_time/duration_minutes) are part of the object.
-    final_session_data = schemas.FocusSessionCreate(**temp_focus_session_data)
+        # model_copy applies the computed field without running validation again.
+        final_session_data = focus_session_create.model_copy(update={"duration_minutes": _minutes(end_time - start_time)})
+    elif end_time is None and duration_minutes is not None:
+        final_session_data = focus_session_create.model_copy(update={"end_time": start_time + datetime.timedelta(minutes=duration_minutes)})
 
-    return crud.create_focus_session(db=db, focus_session=final_session_data, user_id=current_user.id)
+    db_focus_session = crud.create_focus_session(db=db, session_create=final_session_data, user_id=current_user.id)
+    _invalidate_reports(current_user.id)
+    return db_focus_session
 
 @focus_sessions_router.get("/", response_model=List[schemas.FocusSession])
 def read_focus_sessions_endpoint( # Renamed
+    response: Response,
     task_id: Optional[int] = None,
     date_start: Optional[datetime.datetime] = None,
     date_end: Optional[datetime.datetime] = None,
     status_filter: Optional[schemas.FocusSessionStatus] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = _LIMIT_QUERY,
+    cursor: Optional[str] = _CURSOR_QUERY,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
-    return crud.get_focus_sessions(
+    focus_sessions = crud.get_focus_sessions(
         db=db, user_id=current_user.id, task_id=task_id,
         start_time_after=date_start, start_time_before=date_end,
-        status=status_filter, skip=skip, limit=limit
+        status=status_filter, skip=skip, limit=limit + 1, after=_decode_cursor(cursor),
     )
+    return _cursor_page(focus_sessions, limit, "start_time", response)
+
+@focus_sessions_router.get("/export", response_class=StreamingResponse)
+def export_focus_sessions_endpoint(
+    date_start: Optional[datetime.datetime] = None,
+    date_end: Optional[datetime.datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
+):
+    """ Streams the user's focus sessions as newline-delimited JSON, read from the database in chunks. """
+    def generate():
+        for focus_session in crud.iter_focus_sessions(
+            db, user_id=current_user.id, start_time_after=date_start, start_time_before=date_end
+        ):
+            yield schemas.FocusSession.model_validate(focus_session).model_dump_json() + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @focus_sessions_router.get("/{session_id}", response_model=schemas.FocusSession)
 def read_focus_session_endpoint( # Renamed
     session_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
+    # Poll loops send back the ETag they hold: answer 304 from the row's version counter alone
+    # (one-column SELECT, entity not loaded) when it still matches.
+    etag = _etag(session_id, crud.get_focus_session_version(db=db, session_id=session_id, user_id=current_user.id))
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
     db_focus_session = crud.get_focus_session(db=db, session_id=session_id, user_id=current_user.id)
     if db_focus_session is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Focus session not found")
+    if etag is not None:
+        response.headers["ETag"] = etag
     return db_focus_session
 
 @focus_sessions_router.put("/{session_id}", response_model=schemas.FocusSession)
@@ -77,60 +173,40 @@ def update_focus_session_endpoint( # Renamed
     session_id: int,
     focus_session_update: schemas.FocusSessionUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     db_focus_session = crud.get_focus_session(db=db, session_id=session_id, user_id=current_user.id)
     if db_focus_session is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Focus session not found")
 
-    update_data = focus_session_update.dict(exclude_unset=True)
-
-    # Recalculate duration or end_time if relevant fields are updated
-    # Get current values from db_focus_session and override with any from update_data
-    current_start = update_data.get('start_time', db_focus_session.start_time)
-    current_end = update_data.get('end_time', db_focus_session.end_time)
-    current_duration = update_data.get('duration_minutes', db_focus_session.duration_minutes)
-    current_status = update_data.get('status', db_focus_session.status)
-
-    # Create a new FocusSessionUpdate instance to pass to CRUD to avoid modifying input
-    processed_update_data = update_data.copy()
-
-    if 'duration_minutes' in update_data and update_data['duration_minutes'] is not None:
-        if current_start:
-            processed_update_data['end_time'] = current_start + datetime.timedelta(minutes=update_data['duration_minutes'])
-    elif ('start_time' in update_data or 'end_time' in update_data):
-        # This case handles if start_time or end_time is changed, then duration should be recalculated
-        # but only if duration_minutes was NOT part of the update request.
-        # If end_time is explicitly set to None (e.g. session restarted), duration might become None too.
-        if current_start and current_end:
-            if current_end < current_start:
-                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_time cannot be before start_time")
-            delta = current_end - current_start
-            processed_update_data['duration_minutes'] = int(delta.total_seconds() / 60)
-        else: # If either start or end becomes None (and duration wasn't set), duration becomes None
-            processed_update_data['duration_minutes'] = None
+    # Only end_time, status and notes are updatable; start_time comes from the stored session.
+    # Read the sent fields straight off the validated model rather than dumping it to a dict.
+    set_fields = focus_session_update.model_fields_set
+    current_start = db_focus_session.start_time
+    current_end = focus_session_update.end_time if 'end_time' in set_fields else db_focus_session.end_time
 
-    # If session is completed, ensure end_time is set
-    if processed_update_data.get('status') == schemas.FocusSessionStatus.COMPLETED and not current_end:
-        processed_update_data['end_time'] = datetime.datetime.utcnow()
-        # Recalculate duration if end_time was just set
-        if current_start and processed_update_data.get('end_time'):
-            delta = processed_update_data['end_time'] - current_start
-            processed_update_data['duration_minutes'] = int(delta.total_seconds() / 60)
+    if 'end_time' in set_fields and current_end is not None and current_end < current_start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_time cannot be before start_time")
 
+    # If session is completed, ensure end_time is set
+    final_update_schema = focus_session_update
+    if focus_session_update.status is _COMPLETED and not current_end:
+        final_update_schema = focus_session_update.model_copy(update={'end_time': models.utcnow()})
 
-    final_update_schema = schemas.FocusSessionUpdate(**processed_update_data)
-    return crud.update_focus_session(db=db, db_focus_session=db_focus_session, focus_session_update=final_update_schema)
+    db_focus_session = crud.update_focus_session(db=db, db_session=db_focus_session, session_update=final_update_schema)
+    _invalidate_reports(current_user.id)
+    return db_focus_session
 
 @focus_sessions_router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_focus_session_endpoint( # Renamed
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     db_focus_session = crud.delete_focus_session(db=db, session_id=session_id, user_id=current_user.id)
     if db_focus_session is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Focus session not found")
+    _invalidate_reports(current_user.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -144,38 +220,68 @@ energy_logs_router = APIRouter(
 def create_energy_log_endpoint( # Renamed
     energy_log: schemas.EnergyLogCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
-    return crud.create_energy_log(db=db, energy_log=energy_log, user_id=current_user.id)
+    db_energy_log = crud.create_energy_log(db=db, log_create=energy_log, user_id=current_user.id)
+    _invalidate_reports(current_user.id)
+    return db_energy_log
 
 @energy_logs_router.get("/", response_model=List[schemas.EnergyLog])
 def read_energy_logs_endpoint( # Renamed
+    response: Response,
     date_start: Optional[datetime.datetime] = None,
     date_end: Optional[datetime.datetime] = None,
     energy_level: Optional[schemas.EnergyLevel] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = _LIMIT_QUERY,
+    cursor: Optional[str] = _CURSOR_QUERY,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     if date_end is not None and date_end.time() == datetime.time.min:
         date_end = datetime.datetime.combine(date_end.date(), datetime.time.max)
 
-    return crud.get_energy_logs(
+    energy_logs = crud.get_energy_logs(
         db=db, user_id=current_user.id,
         timestamp_after=date_start, timestamp_before=date_end,
-        energy_level=energy_level, skip=skip, limit=limit
+        energy_level=energy_level, skip=skip, limit=limit + 1, after=_decode_cursor(cursor),
     )
+    return _cursor_page(energy_logs, limit, "timestamp", response)
+
+@energy_logs_router.get("/export", response_class=StreamingResponse)
+def export_energy_logs_endpoint(
+    date_start: Optional[datetime.datetime] = None,
+    date_end: Optional[datetime.datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
+):
+    """ Streams the user's energy logs as newline-delimited JSON, read from the database in chunks. """
+    def generate():
+        for log in crud.iter_energy_logs(
+            db, user_id=current_user.id, timestamp_after=date_start, timestamp_before=date_end, chunk=500
+        ):
+            yield schemas.EnergyLog.model_validate(log).model_dump_json() + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @energy_logs_router.get("/{log_id}", response_model=schemas.EnergyLog)
 def read_energy_log_endpoint( # Renamed
     log_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
+    # Poll loops send back the ETag they hold: answer 304 from the row's version counter alone
+    # (one-column SELECT, entity not loaded) when it still matches.
+    etag = _etag(log_id, crud.get_energy_log_version(db=db, log_id=log_id, user_id=current_user.id))
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
     db_energy_log = crud.get_energy_log(db=db, log_id=log_id, user_id=current_user.id)
     if db_energy_log is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Energy log not found")
+    if etag is not None:
+        response.headers["ETag"] = etag
     return db_energy_log
 
 @energy_logs_router.put("/{log_id}", response_model=schemas.EnergyLog)
@@ -183,22 +289,25 @@ def update_energy_log_endpoint( # Renamed
     log_id: int,
     energy_log_update: schemas.EnergyLogUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
-    db_energy_log = crud.get_energy_log(db=db, log_id=log_id, user_id=current_user.id)
+    # Ownership is part of the UPDATE's WHERE clause; None means missing or not the user's.
+    db_energy_log = crud.update_energy_log_by_id(db=db, log_id=log_id, user_id=current_user.id, log_update=energy_log_update)
     if db_energy_log is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Energy log not found")
-    return crud.update_energy_log(db=db, db_energy_log=db_energy_log, energy_log_update=energy_log_update)
+    _invalidate_reports(current_user.id)
+    return db_energy_log
 
 @energy_logs_router.delete("/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_energy_log_endpoint( # Renamed
     log_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     db_energy_log = crud.delete_energy_log(db=db, log_id=log_id, user_id=current_user.id)
     if db_energy_log is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Energy log not found")
+    _invalidate_reports(current_user.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -208,37 +317,66 @@ reports_router = APIRouter(
     tags=["reports"],
 )
 
+def _days_ago(days: int):
+    # Query default factory: report date defaults are computed per request, not frozen at import.
+    return lambda: datetime.date.today() - datetime.timedelta(days=days)
+
+# Least-squares slope, in energy levels per day, beyond which the trend is no longer "stable".
+_ENERGY_TREND_THRESHOLD = 0.05
+
+def _energy_trend(timestamps: List[datetime.datetime], levels: List[int]) -> str:
+    if not levels:
+        return "no_data"
+    first = timestamps[0]
+    days = [(ts - first).total_seconds() / 86400 for ts in timestamps]
+    try:
+        slope = statistics.linear_regression(days, levels).slope
+    except statistics.StatisticsError: # Fewer than two points, or all logged at the same instant
+        return "stable"
+    if slope > _ENERGY_TREND_THRESHOLD:
+        return "improving"
+    if slope < -_ENERGY_TREND_THRESHOLD:
+        return "declining"
+    return "stable"
+
 @reports_router.get("/energy", response_model=schemas.EnergyReport)
+@_cached_report
 def get_energy_report_endpoint( # Renamed
     period: str = "daily",
-    date_start: datetime.date = datetime.date.today() - datetime.timedelta(days=7),
-    date_end: datetime.date = datetime.date.today(),
-    current_user: models.User = Depends(get_current_active_user),
+    date_start: datetime.date = Query(default_factory=_days_ago(7)),
+    date_end: datetime.date = Query(default_factory=datetime.date.today),
+    db: Session = Depends(get_db),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
-    dummy_data_points = [
-        schemas.EnergyReportDataPoint(timestamp=datetime.datetime.combine(date_start + datetime.timedelta(days=i), datetime.time(10,0)), energy_level=schemas.EnergyLevel.MEDIUM if i % 2 == 0 else schemas.EnergyLevel.HIGH)
-        for i in range((date_end - date_start).days + 1)
-    ]
-    if not dummy_data_points and (date_end - date_start).days >=0 : # Ensure at least one point if period is valid
-         dummy_data_points.append(schemas.EnergyReportDataPoint(timestamp=datetime.datetime.combine(date_start, datetime.time(10,0)), energy_level=schemas.EnergyLevel.MEDIUM))
-
+    # Aggregates over the bare (timestamp, level) columns rather than hydrated EnergyLog rows.
+    series = crud.get_energy_series(
+        db=db, user_id=current_user.id,
+        timestamp_after=datetime.datetime.combine(date_start, datetime.time.min),
+        timestamp_before=datetime.datetime.combine(date_end, datetime.time.max),
+    )
+    timestamps = [ts for ts, _ in series]
+    levels = [level.value for _, level in series]
 
-    return schemas.EnergyReport(
+    return schemas.EnergyReport.model_construct(
         user_id=current_user.id,
         report_period_start=date_start,
         report_period_end=date_end,
-        average_energy_level=3.5 if dummy_data_points else None,
-        energy_trend="stable" if dummy_data_points else "no_data",
-        data_points=dummy_data_points
+        average_energy_level=statistics.fmean(levels) if levels else None,
+        energy_trend=_energy_trend(timestamps, levels),
+        data_points=[
+            schemas.EnergyReportDataPoint.model_construct(timestamp=ts, energy_level=schemas.EnergyLevel(level))
+            for ts, level in zip(timestamps, levels)
+        ],
     )
 
 @reports_router.get("/task-completion", response_model=schemas.TaskCompletionReport)
+@_cached_report
 def get_task_completion_report_endpoint( # Renamed
     period: str = "weekly",
-    date_start: datetime.date = datetime.date.today() - datetime.timedelta(days=7),
-    date_end: datetime.date = datetime.date.today(),
+    date_start: datetime.date = Query(default_factory=_days_ago(7)),
+    date_end: datetime.date = Query(default_factory=datetime.date.today),
     project_id: Optional[int] = None,
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     start_dt = datetime.datetime.combine(date_start, datetime.time.min)
     end_dt = datetime.datetime.combine(date_end, datetime.time.max)
@@ -258,11 +396,12 @@ def get_task_completion_report_endpoint( # Renamed
     )
 
 @reports_router.get("/screen-time", response_model=schemas.ScreenTimeReport)
+@_cached_report
 def get_screen_time_report_endpoint( # Renamed
     period: str = "daily", # Not used in dummy logic directly, but available
-    date_start: datetime.date = datetime.date.today() - datetime.timedelta(days=1),
-    date_end: datetime.date = datetime.date.today(), # Using this as the report_date for dummy
-    current_user: models.User = Depends(get_current_active_user),
+    date_start: datetime.date = Query(default_factory=_days_ago(1)),
+    date_end: datetime.date = Query(default_factory=datetime.date.today), # Using this as the report_date for dummy
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     return schemas.ScreenTimeReport(
         user_id=current_user.id,
@@ -1,35 +1,56 @@
 # Project management router
+# Handlers are plain `def`: crud uses a blocking Session, so FastAPI runs them in its threadpool
+# instead of blocking the event loop for the length of each query.
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import threading
+from cachetools import TTLCache
 
 from .. import crud, schemas, models
-from ..dependencies import get_db, get_current_active_user
+from ..dependencies import get_db, get_current_active_principal
 
 router = APIRouter(
     tags=["projects"],
-    dependencies=[Depends(get_current_active_user)], # All project routes require an active user
+    # No router-level auth dependency: every route takes `current_user`, which already requires an active user.
     responses={404: {"description": "Not found"}},
 )
 
+# GET /projects/{id} response bodies per user: user_id -> {project_id: JSON str}. The short TTL
+# bounds staleness across workers; within this one, a user's entries are dropped on any write that
+# can change a project response (project, task and tag writes; see invalidate_cached_projects).
+_project_cache: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+_project_cache_lock = threading.Lock()
+
+def invalidate_cached_projects(user_id: int) -> None:
+    with _project_cache_lock:
+        _project_cache.pop(user_id, None)
+
 @router.post("/", response_model=schemas.Project, status_code=status.HTTP_201_CREATED)
-async def create_new_project(
+def create_new_project(
     project: schemas.ProjectCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Create a new project for the current user.
     """
     return crud.create_project(db=db, project_create=project, owner_id=current_user.id)
 
+# The list page is validated and dumped to JSON in one pydantic-core call each, in the handler's
+# own threadpool slot; returning a Response skips FastAPI's separate response-model pass.
+# response_model stays on the route for the OpenAPI schema.
+_PROJECT_LIST = TypeAdapter(List[schemas.Project])
+
 @router.get("/", response_model=List[schemas.Project])
-async def read_user_projects(
+def read_user_projects(
     archived: Optional[bool] = Query(False, description="Filter by archived status. False returns active (non-archived) projects."),
     skip: int = 0,
     limit: int = 100,
+    after_id: Optional[int] = Query(None, description="Keyset pagination: return items with id greater than this (the last id of the previous page)."),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Retrieve all projects for the current user.
@@ -46,48 +67,55 @@ async def read_user_projects(
         user_id=current_user.id,
         archived=archived, # Pass the 'archived' status to the CRUD function
         skip=skip,
-        limit=limit
+        limit=limit,
+        after_id=after_id,
     )
-    return projects
+    return Response(content=_PROJECT_LIST.dump_json(_PROJECT_LIST.validate_python(projects, from_attributes=True)), media_type="application/json")
 
 @router.get("/{project_id}", response_model=schemas.Project)
-async def read_single_project(
+def read_single_project(
     project_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Retrieve a specific project by its ID.
     Ensures the project belongs to the current user.
     """
-    db_project = crud.get_project(db, project_id=project_id, user_id=current_user.id)
-    if db_project is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found or not accessible")
-    return db_project
+    with _project_cache_lock:
+        body = _project_cache.get(current_user.id, {}).get(project_id)
+    if body is None:
+        db_project = crud.get_project(db, project_id=project_id, user_id=current_user.id, with_tasks=True)
+        if db_project is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found or not accessible")
+        body = schemas.Project.model_validate(db_project).model_dump_json()
+        with _project_cache_lock:
+            _project_cache.setdefault(current_user.id, {})[project_id] = body
+    return Response(content=body, media_type="application/json")
 
 @router.put("/{project_id}", response_model=schemas.Project)
-async def update_existing_project(
+def update_existing_project(
     project_id: int,
     project_update: schemas.ProjectUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Update an existing project.
     Ensures the project belongs to the current user before updating.
     """
-    db_project = crud.get_project(db, project_id=project_id, user_id=current_user.id)
-    if db_project is None:
+    # Ownership is checked in the UPDATE's WHERE clause; no row back means missing or not theirs.
+    updated_project = crud.update_project_by_id(db, project_id=project_id, user_id=current_user.id, project_update=project_update)
+    if updated_project is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found or not accessible for update")
-
-    updated_project = crud.update_project(db=db, db_project=db_project, project_update=project_update)
+    invalidate_cached_projects(current_user.id)
     return updated_project
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_existing_project(
+def delete_existing_project(
     project_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Delete an existing project.
@@ -96,4 +124,5 @@ async def delete_existing_project(
     deleted_project = crud.delete_project(db, project_id=project_id, user_id=current_user.id)
     if deleted_project is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found or not accessible for deletion")
+    invalidate_cached_projects(current_user.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
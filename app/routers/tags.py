@@ -1,23 +1,39 @@
 # Tag management router
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+# Handlers are plain `def`: crud uses a blocking Session, so FastAPI runs them in its threadpool
+# instead of blocking the event loop for the length of each query.
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError # For handling unique constraint violations
-from typing import List
+from typing import List, Optional
+import threading
+from cachetools import TTLCache
 
 from .. import crud, schemas, models
-from ..dependencies import get_db, get_current_active_user
+from ..dependencies import get_db, get_current_active_principal
+from .projects import invalidate_cached_projects
 
 router = APIRouter(
     tags=["tags"],
-    dependencies=[Depends(get_current_active_user)],
+    # No router-level auth dependency: every route takes `current_user`, which already requires an active user.
     responses={404: {"description": "Not found"}},
 )
 
+# GET /tags/{id} response bodies per user: user_id -> {tag_id: JSON str}, dropped on tag updates
+# and deletes; the short TTL bounds staleness across workers.
+_tag_cache: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+_tag_cache_lock = threading.Lock()
+
+def _invalidate_cached_tags(user_id: int) -> None:
+    with _tag_cache_lock:
+        _tag_cache.pop(user_id, None)
+    invalidate_cached_projects(user_id) # Project responses embed each task's tags
+
 @router.post("/", response_model=schemas.Tag, status_code=status.HTTP_201_CREATED)
-async def create_new_tag(
+def create_new_tag(
     tag_create: schemas.TagCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Create a new tag for the current user.
@@ -26,8 +42,8 @@ async def create_new_tag(
     try:
         created_tag = crud.create_tag(db=db, tag_create=tag_create, user_id=current_user.id)
         return created_tag
-    except ValueError as e: # Catch custom ValueError for name collision from CRUD
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ValueError as e: # Name collision: the conflicting INSERT returned no row
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except IntegrityError: # Catch DB level unique constraint violation if CRUD didn't catch it first
         db.rollback()
         raise HTTPException(
@@ -36,65 +52,74 @@ async def create_new_tag(
         )
 
 
+# Validated and dumped in one pydantic-core call each; see projects._PROJECT_LIST.
+_TAG_LIST = TypeAdapter(List[schemas.Tag])
+
 @router.get("/", response_model=List[schemas.Tag])
-async def read_user_tags(
+def read_user_tags(
     skip: int = 0,
     limit: int = 100,
+    after_id: Optional[int] = Query(None, description="Keyset pagination: return items with id greater than this (the last id of the previous page)."),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Retrieve all tags for the current user.
     """
-    tags = crud.get_tags_by_user(db=db, user_id=current_user.id, skip=skip, limit=limit)
-    return tags
+    tags = crud.get_tags_by_user(db=db, user_id=current_user.id, skip=skip, limit=limit, after_id=after_id)
+    return Response(content=_TAG_LIST.dump_json(_TAG_LIST.validate_python(tags, from_attributes=True)), media_type="application/json")
 
 @router.get("/{tag_id}", response_model=schemas.Tag)
-async def read_single_tag(
+def read_single_tag(
     tag_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Retrieve a specific tag by its ID, owned by the current user.
     """
-    db_tag = crud.get_tag(db=db, tag_id=tag_id, user_id=current_user.id)
-    if db_tag is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
-    return db_tag
+    with _tag_cache_lock:
+        body = _tag_cache.get(current_user.id, {}).get(tag_id)
+    if body is None:
+        db_tag = crud.get_tag(db=db, tag_id=tag_id, user_id=current_user.id)
+        if db_tag is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
+        body = schemas.Tag.model_validate(db_tag).model_dump_json()
+        with _tag_cache_lock:
+            _tag_cache.setdefault(current_user.id, {})[tag_id] = body
+    return Response(content=body, media_type="application/json")
 
 @router.put("/{tag_id}", response_model=schemas.Tag)
-async def update_existing_tag(
+def update_existing_tag(
     tag_id: int,
     tag_update: schemas.TagUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Update an existing tag owned by the current user.
     If name changes, uniqueness per user must be maintained.
     """
-    db_tag = crud.get_tag(db=db, tag_id=tag_id, user_id=current_user.id)
-    if db_tag is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
-
     try:
-        updated_tag = crud.update_tag(db=db, db_tag=db_tag, tag_update=tag_update, user_id=current_user.id)
-        return updated_tag
-    except ValueError as e: # Catch custom ValueError for name collision from CRUD
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except IntegrityError: # Catch DB level unique constraint violation
+        updated_tag = crud.update_tag_by_id(db=db, tag_id=tag_id, user_id=current_user.id, tag_update=tag_update)
+    except ValueError as e: # Rename onto another of the user's tag names: same 409 as create
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except IntegrityError: # uq_user_tag_name: a concurrent rename that got past crud's pre-check
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Tag name already exists for this user or other integrity error.",
         )
+    if updated_tag is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
+    _invalidate_cached_tags(current_user.id)
+    return updated_tag
 
 @router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_existing_tag(
+def delete_existing_tag(
     tag_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Delete an existing tag owned by the current user.
@@ -102,4 +127,5 @@ async def delete_existing_tag(
     deleted_tag = crud.delete_tag(db=db, tag_id=tag_id, user_id=current_user.id)
     if deleted_tag is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
+    _invalidate_cached_tags(current_user.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
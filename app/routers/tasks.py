@@ -1,23 +1,33 @@
 # Task management router
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import datetime # Added import
 
 from .. import crud, schemas, models
-from ..dependencies import get_db, get_current_active_user
+from ..dependencies import get_db, get_current_active_principal
+from .projects import invalidate_cached_projects
+
+def _drop_cached_projects_after_write(request: Request, current_user: crud.UserPrincipal = Depends(get_current_active_principal)):
+    # Cached GET /projects/{id} bodies embed the project's tasks, so any task write drops the user's
+    # entries. scope="function" runs this after the handler but before the response goes out.
+    yield
+    if request.method != "GET":
+        invalidate_cached_projects(current_user.id)
 
 router = APIRouter(
     tags=["tasks"],
-    dependencies=[Depends(get_current_active_user)], # All task routes require an active user
+    # All task routes require an active user
+    dependencies=[Depends(_drop_cached_projects_after_write, scope="function")],
     responses={404: {"description": "Not found"}},
 )
 
 @router.post("/", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
-async def create_new_task(
+def create_new_task(
     task_create: schemas.TaskCreate, # schema now includes project_id, title, description, etc.
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Create a new task.
@@ -36,7 +46,7 @@ async def create_new_task(
     return created_task
 
 @router.get("/", response_model=List[schemas.Task])
-async def read_user_tasks(
+def read_user_tasks(
     project_id: Optional[int] = None,
     parent_task_id: Optional[int] = Query(None, description="Filter tasks by parent task ID"),
     completed: Optional[bool] = None,
@@ -48,34 +58,73 @@ async def read_user_tasks(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Retrieve tasks for the current user with extensive filtering options.
     """
-    # TODO: Update crud.get_tasks to handle parent_task_id, is_recurring, tags filters.
-    # For `tags` filter, `crud.get_tasks` would need to handle a list of tag names or IDs.
     tasks = crud.get_tasks(
         db,
         user_id=current_user.id,
         project_id=project_id,
         completed=completed,
-        # parent_id=parent_task_id, # Pass if/when supported by CRUD
+        parent_task_id=parent_task_id,
         priority=priority,
         due_date_after=due_date_start, # Parameter name mapping
         due_date_before=due_date_end,  # Parameter name mapping
-        # is_recurring=is_recurring, # Pass if/when supported by CRUD
-        # tags=tags, # Pass if/when supported by CRUD
+        is_recurring=is_recurring,
+        tags=tags,
         skip=skip,
         limit=limit
     )
     return tasks
 
+@router.get("/export", response_class=StreamingResponse)
+def export_user_tasks(
+    project_id: Optional[int] = None,
+    completed: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
+):
+    """
+    Export all of the current user's tasks as newline-delimited JSON.
+    Rows are streamed from the database in chunks rather than loaded as one list.
+    """
+    def generate():
+        for task in crud.iter_tasks(db, user_id=current_user.id, project_id=project_id, completed=completed):
+            yield schemas.Task.model_validate(task).model_dump_json() + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+# Declared before the /{task_id} routes: Starlette matches in order, and PUT /{task_id} would
+# otherwise take /reorder and reject it as a non-integer task_id.
+@router.put("/reorder", response_model=List[schemas.Task])
+def reorder_tasks_batch(
+    reorder_items: List[schemas.TaskReorderItem],
+    db: Session = Depends(get_db),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
+):
+    """
+    Batch update task order, status, or project.
+    """
+    try:
+        updated_tasks = crud.reorder_tasks(db=db, reorder_items=reorder_items, user_id=current_user.id)
+        return updated_tasks
+    except Exception as e:
+        # Catch specific exceptions from CRUD if defined, or a general one
+        # For example, if crud.reorder_tasks raises ValueError for not found items:
+        if "not found or user does not have access" in str(e) or "not found or user does not have access" in str(e): # Basic check
+             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        elif "Project with id" in str(e) and "not found" in str(e):
+             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        # Generic error for other issues during reorder
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error reordering tasks: {str(e)}")
+
 @router.get("/{task_id}", response_model=schemas.Task)
-async def read_single_task(
+def read_single_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Retrieve a specific task by its ID.
@@ -87,11 +136,11 @@ async def read_single_task(
     return db_task
 
 @router.put("/{task_id}", response_model=schemas.Task)
-async def update_existing_task(
+def update_existing_task(
     task_id: int,
     task_update: schemas.TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Update an existing task.
@@ -111,26 +160,26 @@ async def update_existing_task(
     return updated_task
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_existing_task(
+def delete_existing_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Delete an existing task.
     Ensures the task belongs to a project owned by the current user.
     """
     deleted_task = crud.delete_task(db, task_id=task_id, user_id=current_user.id)
-    if deleted_task is None: # crud.delete_task returns the object if deleted, or None
+    if deleted_task is None: # crud.delete_task returns the deleted id, or None
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found or not accessible for deletion")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.post("/{task_id}/subtasks", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
-async def create_subtask_for_task(
+def create_subtask_for_task(
     task_id: int, # Parent task ID
     subtask_create: schemas.TaskCreate, # Subtask details. project_id should match parent's project
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Create a subtask for a given parent task.
@@ -156,11 +205,11 @@ async def create_subtask_for_task(
     # Create a new TaskCreate object that includes parent_id.
     # This is a bit of a workaround if TaskCreate doesn't directly support parent_id.
     # A cleaner way is to have parent_id in TaskCreate schema.
-    actual_subtask_create_data = subtask_create.dict()
+    actual_subtask_create_data = subtask_create.model_dump()
     actual_subtask_create_data['parent_id'] = task_id # Assuming Task model and crud.create_task can handle this.
 
     # If TaskCreate schema is updated to include parent_id:
-    # subtask_create_with_parent = schemas.TaskCreate(**subtask_create.dict(), parent_id=task_id)
+    # subtask_create_with_parent = schemas.TaskCreate(**subtask_create.model_dump(), parent_id=task_id)
     # created_subtask = crud.create_task(db=db, task_create=subtask_create_with_parent, project_id=parent_task.project_id)
 
     # This part is highly dependent on how `parent_id` is structured in models and schemas.
@@ -173,7 +222,7 @@ async def create_subtask_for_task(
     # Also, ensure other fields like assignee_id are handled correctly if they should be inherited or explicitly set.
 
     # Create a new TaskCreate schema for the subtask, ensuring correct project_id and parent_task_id
-    subtask_data_for_create = subtask_create.dict(exclude_unset=True) # Get only fields that were set
+    subtask_data_for_create = subtask_create.model_dump(exclude_unset=True) # Get only fields that were set
     subtask_data_for_create['project_id'] = parent_task.project_id
     subtask_data_for_create['parent_task_id'] = task_id
 
@@ -188,44 +237,23 @@ async def create_subtask_for_task(
     return created_subtask
 
 
-@router.put("/reorder", response_model=List[schemas.Task])
-async def reorder_tasks_batch(
-    reorder_items: List[schemas.TaskReorderItem],
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
-):
-    """
-    Batch update task order, status, or project.
-    """
-    try:
-        updated_tasks = crud.reorder_tasks(db=db, reorder_items=reorder_items, user_id=current_user.id)
-        return updated_tasks
-    except Exception as e:
-        # Catch specific exceptions from CRUD if defined, or a general one
-        # For example, if crud.reorder_tasks raises ValueError for not found items:
-        if "not found or user does not have access" in str(e) or "not found or user does not have access" in str(e): # Basic check
-             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-        elif "Project with id" in str(e) and "not found" in str(e):
-             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-        # Generic error for other issues during reorder
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error reordering tasks: {str(e)}")
-
-
 # --- Task-Tag Association Endpoints ---
 @router.post("/{task_id}/tags/{tag_id}", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
-async def add_tag_to_a_task(
+def add_tag_to_a_task(
     task_id: int,
     tag_id: int,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Add a tag to a specific task.
     Ensures task belongs to user and tag exists.
+    Returns 201 when the tag was attached, 200 when it was already on the task.
     """
     # Verify task belongs to user (done by crud.get_task with user_id)
     # crud.add_tag_to_task will also get the task and tag
-    updated_task = crud.add_tag_to_task(db=db, task_id=task_id, tag_id=tag_id, user_id=current_user.id)
+    updated_task, already_tagged = crud.add_tag_to_task(db=db, task_id=task_id, tag_id=tag_id, user_id=current_user.id)
     if not updated_task:
         # This could be because task or tag not found, or task not accessible by user
         # crud.add_tag_to_task should ideally raise specific exceptions or return clearer status
@@ -239,14 +267,16 @@ async def add_tag_to_a_task(
         # or if add_tag_to_task returns None because it couldn't find the task (already checked by task_exists)
         # For now, a generic error if updated_task is None after checks.
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to add tag to task.")
+    if already_tagged:
+        response.status_code = status.HTTP_200_OK
     return updated_task
 
 @router.delete("/{task_id}/tags/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def remove_tag_from_a_task(
+def remove_tag_from_a_task(
     task_id: int,
     tag_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Remove a tag from a specific task.
@@ -263,10 +293,10 @@ async def remove_tag_from_a_task(
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.get("/{task_id}/tags", response_model=List[schemas.Tag])
-async def get_all_tags_for_a_task(
+def get_all_tags_for_a_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: crud.UserPrincipal = Depends(get_current_active_principal),
 ):
     """
     Get all tags associated with a specific task.
@@ -282,7 +312,7 @@ async def get_all_tags_for_a_task(
 
 # General Notes:
 # - Standardized prefix to /api/tasks.
-# - All routes are async and depend on get_current_active_user.
+# - All routes are sync `def` (run in the threadpool, since CRUD is blocking) and depend on get_current_active_principal (id/username/is_active only; no full User row).
 # - create_new_task: uses crud.create_task, ensures project ownership, returns 201.
 # - read_user_tasks: Implemented with various filter parameters. Noted TODOs for filters not yet fully supported by current CRUD/models (parent_task_id, is_recurring, tags).
 # - read_single_task: Uses crud.get_task with user_id scoping.
@@ -302,7 +332,7 @@ async def get_all_tags_for_a_task(
 # - Error handling for task/tag association routes made more specific.
 # - `create_new_task` now checks project ownership correctly.
 # - `update_existing_task` now correctly passes `db_task` object to `crud.update_task`.
-# - `delete_existing_task` uses `crud.delete_task` which returns the deleted object or None.
+# - `delete_existing_task` uses `crud.delete_task` which returns the deleted id or None.
 # - `add_tag_to_a_task` status code set to 201.
 # - `remove_tag_from_a_task` status code set to 204.
 # - `get_all_tags_for_a_task` returns List[schemas.Tag].
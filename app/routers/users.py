@@ -1,7 +1,7 @@
 # User management router
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any # Added Dict, Any
+from typing import List, Dict, Any, Optional # Added Dict, Any
 
 from .. import crud, schemas, models
 from ..dependencies import get_db, get_current_active_user
@@ -14,7 +14,7 @@ router = APIRouter(
 )
 
 @router.get("/me", response_model=schemas.User)
-async def read_current_user_me(
+def read_current_user_me(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """
@@ -26,19 +26,21 @@ async def read_current_user_me(
 # They are kept here from the original file but would need proper authorization in a full app.
 # IMPORTANT: Define specific paths like "/me" BEFORE general paths like "/{user_id}".
 @router.get("/", response_model=List[schemas.User], dependencies=[Depends(get_current_active_user)]) # Example: admin only
-async def read_users_list(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+def read_users_list(
+    skip: int = 0, limit: int = 100,
+    after_id: Optional[int] = Query(None, description="Keyset pagination: return items with id greater than this (the last id of the previous page)."),
+    db: Session = Depends(get_db)
     # current_user: models.User = Depends(get_current_active_user) # Add if further auth needed
 ):
     """
     Retrieve a list of users. (Typically admin-only)
     """
     # Add logic here to check if current_user is an admin if this is an admin route.
-    users = crud.get_users(db, skip=skip, limit=limit)
+    users = crud.get_users(db, skip=skip, limit=limit, after_id=after_id)
     return users
 
 @router.get("/{user_id}", response_model=schemas.User, dependencies=[Depends(get_current_active_user)]) # Example: admin/specific access
-async def read_user_by_id(
+def read_user_by_id(
     user_id: int, db: Session = Depends(get_db)
     # current_user: models.User = Depends(get_current_active_user) # Add if further auth needed
 ):
@@ -66,7 +68,7 @@ async def read_user_by_id(
     return current_user
 
 @router.put("/me", response_model=schemas.User)
-async def update_current_user_me(
+def update_current_user_me(
     user_update: schemas.UserUpdate,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -92,7 +94,7 @@ async def update_current_user_me(
     return updated_user
 
 @router.put("/me/password", status_code=status.HTTP_204_NO_CONTENT)
-async def update_current_user_password(
+def update_current_user_password(
     password_update: schemas.PasswordUpdate,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -116,7 +118,7 @@ async def update_current_user_password(
 # If not, these would need to be adapted (e.g., to a separate Preferences model/table).
 
 @router.get("/me/preferences", response_model=Dict[str, Any])
-async def get_user_preferences(
+def get_user_preferences(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """
@@ -129,7 +131,7 @@ async def get_user_preferences(
 
 
 @router.put("/me/preferences", response_model=Dict[str, Any])
-async def update_user_preferences(
+def update_user_preferences(
     preferences: Dict[str, Any],
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -140,11 +142,10 @@ async def update_user_preferences(
     """
     current_user.preferences = preferences
     db.add(current_user) # Add to session before commit
-    db.commit()
-    db.refresh(current_user)
+    db.commit() # Sessions don't expire on commit, so no refresh is needed to read it back
     return current_user.preferences if current_user.preferences is not None else {}
 
-# Added async to all route functions for consistency with FastAPI best practices.
+# Route functions are plain `def` (run in the threadpool) because the CRUD calls they make are blocking.
 # Changed prefix to /api/users.
 # Removed router-level dependency, applied get_current_active_user specifically to /me routes.
 # Kept existing / and /{user_id} routes but noted they need proper auth.
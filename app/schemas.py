@@ -1,5 +1,5 @@
 # Pydantic schemas for API request/response validation
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import List, Optional, Dict, Any
 import datetime
 from datetime import date, time # Ensure date and time types are available for type hints
@@ -146,8 +146,7 @@ class Task(TaskBase): # Forward declaration
     sub_tasks: List['Task'] = Field(default_factory=list)
 
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Tag(TagBase): # Forward declaration
     id: int
@@ -155,8 +154,7 @@ class Tag(TagBase): # Forward declaration
     updated_at: datetime.datetime
     # tasks: List[Task] = [] # Avoid circular dependency or make it optional if needed for specific endpoints
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Update Task to use the now defined Tag
 Task.update_forward_refs()
@@ -168,8 +166,7 @@ class Project(ProjectBase):
     updated_at: datetime.datetime
     tasks: List[Task] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class User(UserBase):
     id: int
@@ -181,8 +178,7 @@ class User(UserBase):
     preferences: Optional[Dict[str, Any]] = Field(None, example={"theme": "dark", "language": "en"})
 
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class FocusSession(FocusSessionBase):
     id: int
@@ -192,8 +188,7 @@ class FocusSession(FocusSessionBase):
     created_at: datetime.datetime
     updated_at: datetime.datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class EnergyLog(EnergyLogBase):
     id: int
@@ -202,8 +197,7 @@ class EnergyLog(EnergyLogBase):
     created_at: datetime.datetime
     updated_at: datetime.datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Schemas for Task-Tag association (if needed directly)
 # Usually, tags are part of the Task schema.
@@ -211,8 +205,7 @@ class TaskTag(BaseModel): # Only if you need to return this specific link, usual
     task_id: int
     tag_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # --- Token Schemas ---
@@ -355,7 +348,7 @@ AIDecomposeTaskResponse.update_forward_refs()
 # Enum usage for controlled vocabulary fields.
 # Forward references ('TypeName') are used for List[TypeName] where TypeName is defined later in the file.
 # update_forward_refs() is called on models that contain forward references.
-# The Task schema now includes a list of Tags, and Tag schema has its orm_mode.
+# The Task schema now includes a list of Tags, and Tag schema reads from ORM attributes (from_attributes).
 # Removed tasks from Tag schema to simplify and avoid deep circular dependencies for now.
 # If a Tag needs to list its Tasks, that specific endpoint can have a specialized response model.
 # TaskReorderItem for potential drag-and-drop reordering of tasks.
@@ -373,7 +366,7 @@ AIDecomposeTaskResponse.update_forward_refs()
 # Added `Field` to imports.
 # Used `default_factory=datetime.datetime.utcnow` for `created_at` like fields.
 # Made `Token.token_type` have a default of "bearer".
-# Ensured all `orm_mode = True` are within a `Config` class.
+# Read schemas set `model_config = ConfigDict(from_attributes=True)` (the pydantic v2 form of `orm_mode`).
 # Checked for consistency between Base, Create, Update, and Read schemas.
 # Added `EnergyLevel` and `FocusSessionStatus` enums.
 # Used string literals for forward references consistently.
@@ -410,7 +403,7 @@ AIDecomposeTaskResponse.update_forward_refs()
 # The structure seems robust for a wide range of API interactions.
 # `Task.tags: List['Tag']` is correct. `Tag.tasks` was removed, which is a common way to break cycles.
 # If `Tag.tasks` is needed for a specific endpoint, a separate `TagWithTasks(Tag)` schema can be created.
-# `orm_mode` is consistently applied.
+# `from_attributes` is consistently applied.
 # Example values are provided for most fields.
 # Constraints are applied using `Field`.
 # Enums are correctly defined and used.
@@ -29,16 +29,30 @@ def db_engine():
     # Optionally, clean up by dropping tables, though for :memory: it's not strictly needed
     # Base.metadata.drop_all(bind=engine)
 
+def clear_caches():
+    """Empties every process-level cache the app keeps between requests."""
+    from app import crud
+    from app.core import security
+    from app.routers import ai, monitoring, projects, tags
+    for cache in (
+        crud._principal_cache, crud._tag_id_cache, security._verified_tokens,
+        projects._project_cache, tags._tag_cache, monitoring._report_cache, ai._response_cache,
+    ):
+        cache.clear()
+
 @pytest.fixture(scope="function")
 def db_session(db_engine):
     """Yields a SQLAlchemy session for a test. Manages transactions and rollback."""
+    # The caches are keyed by ids and usernames, and each test's rollback lets the next test
+    # reuse the same ids; start every test with them empty.
+    clear_caches()
     connection = db_engine.connect()
 
     # begin a non-ORM transaction
     trans = connection.begin()
 
     # bind an individual Session to the connection
-    SessionLocal_test = sessionmaker(autocommit=False, autoflush=False, bind=connection)
+    SessionLocal_test = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=connection) # Same as app.database.SessionLocal
     db = SessionLocal_test()
 
     yield db
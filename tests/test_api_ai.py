@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime
+
+from app import crud, schemas
+from app.routers import ai
+
+# The AI router is not mounted in app.main, so its handlers are exercised directly.
+USER = crud.UserPrincipal(id=1, username="ai_user", is_active=True)
+
+def test_schedule_day():
+    request_data = schemas.AIScheduleDayRequest(
+        date_to_schedule="2024-07-22",
+        tasks_to_schedule=[
+            {"task_id": 1, "title": "Write report", "estimated_duration_minutes": 90},
+            {"task_id": 2, "title": "Review PRs"}, # No estimate: defaults to 60 minutes
+            {"task_id": 3, "title": "Plan sprint", "estimated_duration_minutes": 30},
+        ],
+        user_preferences={},
+    )
+    response = asyncio.run(ai.schedule_day(request_data, current_user=USER))
+    scheduled = response.scheduled_tasks
+    assert [t.task_id for t in scheduled] == [1, 2, 3]
+    assert [(t.scheduled_start_time, t.scheduled_end_time) for t in scheduled] == [
+        (datetime(2024, 7, 22, 9, 0), datetime(2024, 7, 22, 10, 30)),
+        (datetime(2024, 7, 22, 10, 45), datetime(2024, 7, 22, 11, 45)),
+        (datetime(2024, 7, 22, 12, 0), datetime(2024, 7, 22, 12, 30)),
+    ]
+    assert scheduled[1].estimated_duration_minutes == 60
+
+def test_schedule_day_empty():
+    request_data = schemas.AIScheduleDayRequest(date_to_schedule="2024-07-22", tasks_to_schedule=[], user_preferences={})
+    assert asyncio.run(ai.schedule_day(request_data, current_user=USER)).scheduled_tasks == []
+
+def test_schedule_day_reuses_response_for_identical_request():
+    payload = {"date_to_schedule": "2024-07-23", "tasks_to_schedule": [{"task_id": 7, "title": "Cached"}], "user_preferences": {}}
+    first = asyncio.run(ai.schedule_day(schemas.AIScheduleDayRequest(**payload), current_user=USER))
+    assert asyncio.run(ai.schedule_day(schemas.AIScheduleDayRequest(**payload), current_user=USER)) is first
+    # Responses are never shared across users
+    other_user = crud.UserPrincipal(id=2, username="other_ai_user", is_active=True)
+    assert asyncio.run(ai.schedule_day(schemas.AIScheduleDayRequest(**payload), current_user=other_user)) is not first
+    payload["tasks_to_schedule"][0]["estimated_duration_minutes"] = 30
+    assert asyncio.run(ai.schedule_day(schemas.AIScheduleDayRequest(**payload), current_user=USER)) is not first
@@ -49,6 +49,11 @@ def test_user_register(client: TestClient, db_session: Session):
     assert response_existing_email.status_code == 400
     assert "Email already registered" in response_existing_email.json()["detail"]
 
+    # Same username with a fresh email is reported as a username clash
+    response_existing_username = client.post("/api/auth/register", json={**user_data, "email": "other_" + user_data["email"]})
+    assert response_existing_username.status_code == 400
+    assert "Username already registered" in response_existing_username.json()["detail"]
+
 def test_user_login_for_access_token(client: TestClient):
     user_data = generate_auth_test_user_data("login")
 
@@ -83,3 +88,15 @@ def test_user_login_for_access_token(client: TestClient):
 
 # test_user_logout can be added if /api/auth/logout is implemented with server-side logic (e.g. token blacklisting)
 # For now, assuming JWT is client-side deleted.
+
+
+def test_decode_access_token_cache_honours_expiry():
+    from datetime import timedelta
+    from app.core.security import create_access_token, decode_access_token
+
+    token = create_access_token({"sub": "cached_token_user"}, expires_delta=timedelta(seconds=1))
+    assert decode_access_token(token).username == "cached_token_user"
+    assert decode_access_token(token).username == "cached_token_user" # Served from the verified-token cache
+    time.sleep(1.1)
+    assert decode_access_token(token) is None
+    assert decode_access_token("not.a.token") is None
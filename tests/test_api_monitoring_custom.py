@@ -124,3 +124,151 @@ def test_get_energy_logs_date_range_filter(client: TestClient, db_session: Sessi
     # Teardown: Delete created user
     # Ensure this user is specific to this test and not used elsewhere, or manage cleanup carefully
     # crud.delete_user(db=db_session, user_id=test_user.id) # Commented out for safety, enable if appropriate
+
+
+def test_export_energy_logs_ndjson(client: TestClient, db_session: Session) -> None:
+    headers, test_user = get_user_authentication_headers(client, db_session, email_prefix="export_energy")
+
+    now = datetime.datetime.utcnow().replace(microsecond=0)
+    for hours_ago, notes in ((3, "First"), (2, "Second"), (1, "Third")):
+        crud.create_energy_log(
+            db=db_session,
+            log_create=schemas.EnergyLogCreate(
+                timestamp=now - datetime.timedelta(hours=hours_ago), energy_level=schemas.EnergyLevel.MEDIUM, notes=notes
+            ),
+            user_id=test_user.id,
+        )
+
+    response = client.get("/api/monitoring/energy-logs/export", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [line for line in response.text.splitlines() if line]
+    # Newest first, same ordering as the paginated listing.
+    assert [schemas.EnergyLog.model_validate_json(line).notes for line in lines] == ["Third", "Second", "First"]
+
+
+def test_get_energy_logs_cursor_pagination(client: TestClient, db_session: Session) -> None:
+    headers, test_user = get_user_authentication_headers(client, db_session, email_prefix="cursor_energy")
+
+    now = datetime.datetime.utcnow().replace(microsecond=0)
+    for hours_ago, notes in ((3, "First"), (2, "Second"), (1, "Third")):
+        crud.create_energy_log(
+            db=db_session,
+            log_create=schemas.EnergyLogCreate(
+                timestamp=now - datetime.timedelta(hours=hours_ago), energy_level=schemas.EnergyLevel.LOW, notes=notes
+            ),
+            user_id=test_user.id,
+        )
+
+    url = "/api/monitoring/energy-logs/"
+    first_page = client.get(url, headers=headers, params={"limit": 2})
+    assert first_page.status_code == 200, first_page.text
+    assert [log["notes"] for log in first_page.json()] == ["Third", "Second"]
+    next_cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = client.get(url, headers=headers, params={"limit": 2, "cursor": next_cursor})
+    assert second_page.status_code == 200, second_page.text
+    assert [log["notes"] for log in second_page.json()] == ["First"]
+    assert "X-Next-Cursor" not in second_page.headers # Last page
+
+    bad_cursor = client.get(url, headers=headers, params={"cursor": "not-a-cursor"})
+    assert bad_cursor.status_code == 400
+
+
+def test_create_and_complete_focus_session(client: TestClient, db_session: Session) -> None:
+    headers, test_user = get_user_authentication_headers(client, db_session, email_prefix="focus_session")
+
+    response = client.post(
+        "/api/monitoring/focus-sessions/",
+        json={"start_time": "2024-07-21T14:30:00", "notes": "Deep work"},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    created = response.json()
+    assert created["status"] == "active"
+    assert created["end_time"] is None
+
+    # Completing a session without an end_time stamps one.
+    response = client.put(f"/api/monitoring/focus-sessions/{created['id']}", json={"status": "completed"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "completed"
+    assert response.json()["end_time"] is not None
+    assert response.json()["notes"] == "Deep work"
+
+    response = client.put(
+        f"/api/monitoring/focus-sessions/{created['id']}", json={"end_time": "2024-07-21T14:00:00"}, headers=headers
+    )
+    assert response.status_code == 400
+
+
+def test_get_energy_log_conditional_etag(client: TestClient, db_session: Session) -> None:
+    headers, test_user = get_user_authentication_headers(client, db_session, email_prefix="etag_energy")
+    log = crud.create_energy_log(
+        db=db_session,
+        log_create=schemas.EnergyLogCreate(
+            timestamp=datetime.datetime.utcnow(), energy_level=schemas.EnergyLevel.HIGH, notes="Polled"
+        ),
+        user_id=test_user.id,
+    )
+
+    url = f"/api/monitoring/energy-logs/{log.id}"
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    etag = response.headers["ETag"]
+    assert etag.startswith(f'W/"{log.id}-')
+
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    response = client.get(url, headers={**headers, "If-None-Match": 'W/"stale"'})
+    assert response.status_code == 200
+    assert response.json()["notes"] == "Polled"
+
+    response = client.get("/api/monitoring/energy-logs/999999", headers={**headers, "If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_energy_log_etag_changes_on_every_update(client: TestClient, db_session: Session) -> None:
+    headers, test_user = get_user_authentication_headers(client, db_session, email_prefix="etag_updates")
+    log = crud.create_energy_log(
+        db=db_session,
+        log_create=schemas.EnergyLogCreate(timestamp=datetime.datetime.utcnow(), energy_level=schemas.EnergyLevel.LOW),
+        user_id=test_user.id,
+    )
+    url = f"/api/monitoring/energy-logs/{log.id}"
+    etags = [client.get(url, headers=headers).headers["ETag"]]
+
+    # Back-to-back writes usually land in the same second of updated_at; the ETag must still move
+    for notes in ("first", "second"):
+        assert client.put(url, json={"notes": notes}, headers=headers).status_code == 200
+        etags.append(client.get(url, headers=headers).headers["ETag"])
+    assert len(set(etags)) == 3
+
+    response = client.get(url, headers={**headers, "If-None-Match": etags[1]})
+    assert response.status_code == 200
+    assert response.json()["notes"] == "second"
+
+
+def test_get_energy_report_aggregates_logs(client: TestClient, db_session: Session) -> None:
+    headers, test_user = get_user_authentication_headers(client, db_session, email_prefix="energy_report")
+    start = datetime.datetime(2024, 7, 1, 9, 0)
+    for day, level in enumerate((schemas.EnergyLevel.LOW, schemas.EnergyLevel.MEDIUM, schemas.EnergyLevel.VERY_HIGH)):
+        crud.create_energy_log(
+            db=db_session,
+            log_create=schemas.EnergyLogCreate(timestamp=start + datetime.timedelta(days=day), energy_level=level),
+            user_id=test_user.id,
+        )
+
+    url = "/api/monitoring/reports/energy"
+    response = client.get(url, headers=headers, params={"date_start": "2024-07-01", "date_end": "2024-07-03"})
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["average_energy_level"] == (2 + 3 + 5) / 3
+    assert report["energy_trend"] == "improving"
+    assert [point["energy_level"] for point in report["data_points"]] == [2, 3, 5]
+
+    response = client.get(url, headers=headers, params={"date_start": "2024-08-01", "date_end": "2024-08-03"})
+    assert response.json()["energy_trend"] == "no_data"
+    assert response.json()["data_points"] == []
@@ -220,3 +220,56 @@ def test_delete_project(client: TestClient):
     get_response_user1 = client.get(f"/api/projects/{project_id_to_keep}", headers=headers)
     assert get_response_user1.status_code == 200
     assert get_response_user1.json()["name"] == project_to_keep_name
+
+
+def test_project_reads_have_constant_query_count(client: TestClient, db_session):
+    from sqlalchemy import event
+
+    token = register_and_get_token(client, base_username="projectquerycount")
+    headers = {"Authorization": f"Bearer {token}"}
+    project_ids = []
+    for i in range(2):
+        project = client.post("/api/projects/", json={"name": f"Query count {i}"}, headers=headers).json()
+        project_ids.append(project["id"])
+        for j in range(3):
+            response = client.post("/api/tasks/", json={"title": f"Task {j}", "project_id": project["id"]}, headers=headers)
+            assert response.status_code == 201, response.text
+
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    connection = db_session.get_bind()
+    event.listen(connection, "before_cursor_execute", count)
+    try:
+        response = client.get("/api/projects/", headers=headers)
+        assert response.status_code == 200
+        assert sum(len(p["tasks"]) for p in response.json()) == 6
+        # Auth lookup (unless cached), projects, then one IN-list SELECT each for tasks, tags, sub_tasks.
+        assert len(statements) <= 5, statements
+
+        statements.clear()
+        response = client.get(f"/api/projects/{project_ids[0]}", headers=headers)
+        assert len(response.json()["tasks"]) == 3
+        assert len(statements) <= 5, statements
+    finally:
+        event.remove(connection, "before_cursor_execute", count)
+
+
+def test_get_project_by_id_reflects_writes(client: TestClient):
+    token = register_and_get_token(client, base_username="projectcacheuser")
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = client.post("/api/projects/", json={"name": "Cached"}, headers=headers).json()["id"]
+    url = f"/api/projects/{project_id}"
+
+    assert client.get(url, headers=headers).json()["tasks"] == []
+    # Served from the response cache until a write touches the project
+    assert client.get(url, headers=headers).json()["name"] == "Cached"
+
+    task = client.post("/api/tasks/", json={"title": "New task", "project_id": project_id}, headers=headers).json()
+    assert [t["id"] for t in client.get(url, headers=headers).json()["tasks"]] == [task["id"]]
+
+    client.put(url, json={"name": "Renamed"}, headers=headers)
+    assert client.get(url, headers=headers).json()["name"] == "Renamed"
+
+    client.delete(url, headers=headers)
+    assert client.get(url, headers=headers).status_code == 404
@@ -53,10 +53,9 @@ def test_create_tag(client: TestClient):
 
     # Test creating tag with the same name for the same user (should fail)
     response_duplicate = client.post("/api/tags/", json=payload1, headers=headers)
-    # The router for POST /tags/ uses status_code=status.HTTP_400_BAD_REQUEST for ValueError (name collision)
-    # and status_code=status.HTTP_409_CONFLICT for IntegrityError.
-    # crud.create_tag raises ValueError: "Tag with this name already exists for this user."
-    assert response_duplicate.status_code == 400
+    # The router for POST /tags/ returns 409 Conflict for a name collision, whether crud.create_tag
+    # reports it as ValueError ("Tag with this name already exists for this user.") or IntegrityError.
+    assert response_duplicate.status_code == 409
     assert "already exists" in response_duplicate.json()["detail"]
 
 
@@ -64,6 +63,19 @@ def test_create_tag(client: TestClient):
     response_missing_name = client.post("/api/tags/", json={"color": "#000000"}, headers=headers)
     assert response_missing_name.status_code == 422
 
+
+def test_rename_tag_onto_existing_name_conflicts(client: TestClient):
+    token = register_and_get_token(client, "renameconflicttaguser")
+    headers = {"Authorization": f"Bearer {token}"}
+    taken_name = f"Taken_{time.time_ns()}"
+    assert client.post("/api/tags/", json={"name": taken_name}, headers=headers).status_code == 201
+    tag_id = client.post("/api/tags/", json={"name": f"Renamed_{time.time_ns()}"}, headers=headers).json()["id"]
+
+    # Same 409 Conflict as creating a duplicate name
+    response = client.put(f"/api/tags/{tag_id}", json={"name": taken_name}, headers=headers)
+    assert response.status_code == 409
+    assert "already exists" in response.json()["detail"]
+
 def test_get_tags(client: TestClient):
     token_user1 = register_and_get_token(client, "gettagsuser1")
     headers_user1 = {"Authorization": f"Bearer {token_user1}"}
@@ -164,7 +176,7 @@ def test_update_tag(client: TestClient):
 
     fail_update_payload = {"name": existing_tag_payload["name"]}
     response_fail_update = client.put(f"/api/tags/{tag_id}", json=fail_update_payload, headers=headers)
-    assert response_fail_update.status_code == 400
+    assert response_fail_update.status_code == 409
 
 def test_delete_tag(client: TestClient):
     token = register_and_get_token(client, "deletetaguser")
@@ -141,6 +141,17 @@ def test_get_tasks_with_filters(client: TestClient):
     assert len(response_due_after.json()) == 1
     assert response_due_after.json()[0]["title"] == "T1P1 Active Low"
 
+    # Filter by tags: a task matches if it has any of the given tags, and appears once even with several
+    tag_a_id = create_tag_for_user(client, token, "FilterA")
+    tag_b_id = create_tag_for_user(client, token, "FilterB")
+    for tag_id in (tag_a_id, tag_b_id):
+        assert client.post(f"/api/tasks/{task1_p1['id']}/tags/{tag_id}", headers=headers).status_code == 201
+    assert client.post(f"/api/tasks/{task1_p2['id']}/tags/{tag_b_id}", headers=headers).status_code == 201
+    response_tag_a = client.get(f"/api/tasks/?tags={tag_a_id}", headers=headers)
+    assert [t["title"] for t in response_tag_a.json()] == ["T1P1 Active Low"]
+    response_tags_ab = client.get(f"/api/tasks/?tags={tag_a_id}&tags={tag_b_id}", headers=headers)
+    assert sorted(t["title"] for t in response_tags_ab.json()) == ["T1P1 Active Low", "T1P2 Active Medium"]
+
     # Test pagination (limit, skip) - ensure enough tasks exist for this
     client.post("/api/tasks/", json={"title": "T2P2 Pagination Test", "project_id": project2_id}, headers=headers) # Now 4 tasks total for user
     response_limit2 = client.get("/api/tasks/?limit=2", headers=headers)
@@ -292,4 +303,58 @@ def test_manage_task_tags(client: TestClient):
     assert response_add_other_tag.status_code == 404 # Tag not found for this user
 
 # TODO: Add tests for subtasks (POST /api/tasks/{task_id}/subtasks) if parent_task_id is implemented
-# TODO: Add tests for task reordering (PUT /api/tasks/reorder)
+
+
+def test_reorder_tasks(client: TestClient):
+    token = register_and_get_token(client, "reordertaskuser")
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = create_project_for_user(client, token, "Reorder")
+    task_ids = [
+        client.post("/api/tasks/", json={"title": title, "project_id": project_id}, headers=headers).json()["id"]
+        for title in ("First", "Second")
+    ]
+
+    response = client.put("/api/tasks/reorder", json=[
+        {"task_id": task_ids[1], "new_order_in_list": 1.0},
+        {"task_id": task_ids[0], "new_order_in_list": 2.0},
+    ], headers=headers)
+    assert response.status_code == 200, response.text
+    assert {t["id"]: t["order_in_list"] for t in response.json()} == {task_ids[1]: 1.0, task_ids[0]: 2.0}
+
+
+def test_routers_have_no_duplicate_or_shadowed_routes():
+    from fastapi.routing import APIRoute
+    from app.routers import auth, monitoring, projects, tags, tasks, users
+
+    routers = [
+        auth.router, users.router, projects.router, tasks.router, tags.router,
+        monitoring.focus_sessions_router, monitoring.energy_logs_router, monitoring.reports_router,
+    ]
+    for router in routers:
+        # Declaration order is match order within a router.
+        routes = [(route.path, method) for route in router.routes if isinstance(route, APIRoute) for method in route.methods]
+        assert len(set(routes)) == len(routes)
+        # A literal path must be declared before a same-method parameterised path that would match it first.
+        for index, (path, method) in enumerate(routes):
+            for earlier_path, earlier_method in routes[:index]:
+                if earlier_method != method or "{" not in earlier_path or "{" in path:
+                    continue
+                earlier_parts, parts = earlier_path.split("/"), path.split("/")
+                assert not (len(earlier_parts) == len(parts) and all(
+                    e == p or e.startswith("{") for e, p in zip(earlier_parts, parts)
+                )), f"{method} {path} is shadowed by {earlier_path}"
+
+
+def test_export_tasks_ndjson(client: TestClient):
+    token = register_and_get_token(client, "exporttaskuser")
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = create_project_for_user(client, token, "Export")
+    for i in range(3):
+        response = client.post("/api/tasks/", json={"title": f"Export {i}", "project_id": project_id}, headers=headers)
+        assert response.status_code == 201
+
+    response = client.get(f"/api/tasks/export?project_id={project_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [line for line in response.text.splitlines() if line]
+    assert sorted(schemas.Task.model_validate_json(line).title for line in lines) == ["Export 0", "Export 1", "Export 2"]
@@ -122,6 +122,23 @@ def test_update_energy_log(db_session: Session):
     assert partially_updated_el.energy_level.value == schemas.EnergyLevel.VERY_LOW.value # Should remain
 
 
+def test_update_energy_log_by_id(db_session: Session):
+    user = create_test_user(db_session)
+    other_user = create_test_user(db_session)
+    db_el = crud.create_energy_log(db_session, log_create=schemas.EnergyLogCreate(**ENERGY_LOG_DATA_1), user_id=user.id)
+
+    update_data = schemas.EnergyLogUpdate(notes="Second wind.", energy_level=schemas.EnergyLevel.HIGH)
+    updated_el = crud.update_energy_log_by_id(db_session, log_id=db_el.id, user_id=user.id, log_update=update_data)
+    assert updated_el is not None
+    assert updated_el.notes == "Second wind."
+    assert updated_el.energy_level.value == schemas.EnergyLevel.HIGH.value
+
+    # Another user's log, or a missing one, is not updated
+    assert crud.update_energy_log_by_id(db_session, log_id=db_el.id, user_id=other_user.id, log_update=update_data) is None
+    assert crud.update_energy_log_by_id(db_session, log_id=99999, user_id=user.id, log_update=update_data) is None
+    assert crud.get_energy_log(db_session, log_id=db_el.id, user_id=user.id).notes == "Second wind."
+
+
 def test_delete_energy_log(db_session: Session):
     user = create_test_user(db_session)
     log_in = schemas.EnergyLogCreate(**ENERGY_LOG_DATA_1)
@@ -129,7 +146,7 @@ def test_delete_energy_log(db_session: Session):
 
     deleted_log = crud.delete_energy_log(db_session, log_id=created_log.id, user_id=user.id)
     assert deleted_log is not None
-    assert deleted_log.id == created_log.id
+    assert deleted_log == created_log.id
 
     retrieved_after_delete = crud.get_energy_log(db_session, log_id=created_log.id, user_id=user.id)
     assert retrieved_after_delete is None
@@ -145,3 +162,38 @@ def test_delete_energy_log(db_session: Session):
     failed_delete = crud.delete_energy_log(db_session, log_id=log_to_keep.id, user_id=other_user.id)
     assert failed_delete is None
     assert crud.get_energy_log(db_session, log_id=log_to_keep.id, user_id=user.id) is not None
+
+def test_create_energy_logs_bulk(db_session: Session):
+    user = create_test_user(db_session, username_suffix="bulkenergyuser")
+    logs_in = [schemas.EnergyLogCreate(**ENERGY_LOG_DATA_1), schemas.EnergyLogCreate(**ENERGY_LOG_DATA_2)]
+
+    saved = crud.create_energy_logs_bulk(db_session, logs_create=logs_in, user_id=user.id)
+    assert saved == 2
+
+    logs = crud.get_energy_logs(db_session, user_id=user.id)
+    assert len(logs) == 2
+    assert {log.energy_level.value for log in logs} == {schemas.EnergyLevel.HIGH.value, schemas.EnergyLevel.LOW.value}
+
+def test_copy_energy_logs_falls_back_on_sqlite(db_session: Session):
+    user = create_test_user(db_session, username_suffix="copyenergyuser")
+    logs_in = [schemas.EnergyLogCreate(**ENERGY_LOG_DATA_1), schemas.EnergyLogCreate(**ENERGY_LOG_DATA_2)]
+
+    assert crud.copy_energy_logs(db_session, logs_create=logs_in, user_id=user.id) == 2
+    assert len(crud.get_energy_logs(db_session, user_id=user.id)) == 2
+
+def test_get_energy_logs_keyset_pagination(db_session: Session):
+    user = create_test_user(db_session, username_suffix="seekenergyuser")
+    base_time = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    for i in range(5):
+        crud.create_energy_log(db_session, log_create=schemas.EnergyLogCreate(
+            timestamp=base_time + datetime.timedelta(hours=i), energy_level=schemas.EnergyLevel.MEDIUM
+        ), user_id=user.id)
+
+    first_page = crud.get_energy_logs(db_session, user_id=user.id, limit=2)
+    last = first_page[-1]
+    second_page = crud.get_energy_logs(db_session, user_id=user.id, limit=2, after=crud.SeekCursor(last.timestamp, last.id))
+    rest = crud.get_energy_logs(db_session, user_id=user.id, limit=10, after=crud.SeekCursor(second_page[-1].timestamp, second_page[-1].id))
+
+    timestamps = [log.timestamp for log in first_page + second_page + rest]
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert len(set(log.id for log in first_page + second_page + rest)) == 5
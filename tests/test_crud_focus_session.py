@@ -189,7 +189,7 @@ def test_delete_focus_session(db_session: Session):
 
     deleted_session = crud.delete_focus_session(db_session, session_id=created_session.id, user_id=user.id)
     assert deleted_session is not None
-    assert deleted_session.id == created_session.id
+    assert deleted_session == created_session.id
 
     retrieved_after_delete = crud.get_focus_session(db_session, session_id=created_session.id, user_id=user.id)
     assert retrieved_after_delete is None
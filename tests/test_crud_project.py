@@ -146,6 +146,34 @@ def test_update_project(db_session: Session):
     assert partially_updated_project.description == "Updated description." # Should remain from previous update
 
 
+def test_update_project_by_id(db_session: Session):
+    owner = create_test_user(db_session, email="byid@example.com", username="byidowner")
+    other_owner = create_test_user(db_session, email="byidother@example.com", username="byidother")
+    db_project = crud.create_project(db_session, project_create=schemas.ProjectCreate(**PROJECT_TEST_DATA_1), owner_id=owner.id)
+
+    archived = crud.update_project_by_id(
+        db_session, project_id=db_project.id, user_id=owner.id, project_update=schemas.ProjectUpdate(is_archived=True)
+    )
+    assert archived.is_archived is True
+    assert archived.archived_at is not None
+    assert archived.tasks == []
+
+    # Re-archiving keeps the original timestamp
+    first_archived_at = archived.archived_at
+    rearchived = crud.update_project_by_id(
+        db_session, project_id=db_project.id, user_id=owner.id, project_update=schemas.ProjectUpdate(name="Renamed", is_archived=True)
+    )
+    assert rearchived.name == "Renamed"
+    assert rearchived.archived_at == first_archived_at
+
+    # Ownership is part of the UPDATE: another user's id or a missing project matches nothing
+    assert crud.update_project_by_id(
+        db_session, project_id=db_project.id, user_id=other_owner.id, project_update=schemas.ProjectUpdate(name="Hijacked")
+    ) is None
+    assert crud.update_project_by_id(db_session, project_id=99999, user_id=owner.id, project_update=schemas.ProjectUpdate(name="Nope")) is None
+    assert crud.get_project(db_session, project_id=db_project.id).name == "Renamed"
+
+
 def test_delete_project(db_session: Session):
     owner = create_test_user(db_session)
     project_in = schemas.ProjectCreate(**PROJECT_TEST_DATA_1)
@@ -154,7 +182,7 @@ def test_delete_project(db_session: Session):
     # Test deletion by owner
     deleted_project = crud.delete_project(db_session, project_id=created_project.id, user_id=owner.id)
     assert deleted_project is not None
-    assert deleted_project.id == created_project.id
+    assert deleted_project == created_project.id
 
     retrieved_after_delete = crud.get_project(db_session, project_id=created_project.id, user_id=owner.id)
     assert retrieved_after_delete is None
@@ -169,3 +197,21 @@ def test_delete_project(db_session: Session):
     failed_delete_attempt = crud.delete_project(db_session, project_id=project_to_keep.id, user_id=other_owner.id)
     assert failed_delete_attempt is None # Expecting None if user_id check fails in crud.delete_project
     assert crud.get_project(db_session, project_id=project_to_keep.id, user_id=owner.id) is not None # Ensure it's still there
+
+
+def test_delete_project_cascades_to_tasks(db_session: Session):
+    owner = create_test_user(db_session, email="cascade@example.com", username="cascadeowner")
+    project = crud.create_project(db_session, project_create=schemas.ProjectCreate(name="Cascade"), owner_id=owner.id)
+    parent = crud.create_task(db_session, task_create=schemas.TaskCreate(title="Parent", project_id=project.id))
+    child = crud.create_task(db_session, task_create=schemas.TaskCreate(title="Child", project_id=project.id, parent_task_id=parent.id))
+    tag = crud.create_tag(db_session, tag_create=schemas.TagCreate(name="cascade-tag"), user_id=owner.id)
+    crud.add_tag_to_task(db_session, task_id=parent.id, tag_id=tag.id, user_id=owner.id)
+    parent_id, child_id, tag_id = parent.id, child.id, tag.id
+
+    assert crud.delete_project(db_session, project_id=project.id, user_id=owner.id) == project.id
+
+    remaining_tasks = db_session.query(models.Task).filter(models.Task.id.in_([parent_id, child_id])).count()
+    assert remaining_tasks == 0
+    remaining_links = db_session.query(models.task_tag_association).filter(models.task_tag_association.c.tag_id == tag_id).count()
+    assert remaining_links == 0
+    assert crud.get_tag(db_session, tag_id=tag_id, user_id=owner.id) is not None # Tags belong to the user, not the project
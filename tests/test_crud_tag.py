@@ -124,6 +124,21 @@ def test_get_tags_by_user(db_session: Session):
     assert len(tags_user1_skip1) == 1
     assert tags_user1_limit1[0].name != tags_user1_skip1[0].name
 
+    # Keyset pagination continues after the last id of the previous page
+    tags_user1_after = crud.get_tags_by_user(db_session, user_id=user1.id, after_id=tags_user1_limit1[0].id, limit=1)
+    assert [t.id for t in tags_user1_after] == [tags_user1_skip1[0].id]
+    assert crud.get_tags_by_user(db_session, user_id=user1.id, after_id=tags_user1_after[0].id) == []
+
+
+def test_create_tags_bulk(db_session: Session):
+    user = create_test_user(db_session, username_suffix="bulktaguser")
+    crud.create_tag(db_session, schemas.TagCreate(name="Existing"), user_id=user.id)
+
+    names = ["Existing", "Alpha", "Beta", "Alpha", "Gamma"]
+    inserted = crud.create_tags_bulk(db_session, [schemas.TagCreate(name=n) for n in names], user_id=user.id, batch_size=2)
+    assert inserted == 3 # "Existing" and the repeated "Alpha" are skipped
+    assert sorted(t.name for t in crud.get_tags_by_user(db_session, user_id=user.id)) == ["Alpha", "Beta", "Existing", "Gamma"]
+
 
 def test_update_tag(db_session: Session):
     user = create_test_user(db_session)
@@ -168,6 +183,23 @@ def test_update_tag(db_session: Session):
     assert successful_update.name == other_user_tag_name
 
 
+def test_update_tag_by_id(db_session: Session):
+    user = create_test_user(db_session, username_suffix="tagbyiduser")
+    other_user = create_test_user(db_session, username_suffix="tagbyidother")
+    tag = crud.create_tag(db_session, schemas.TagCreate(name="ById", color="#111111"), user_id=user.id)
+    crud.create_tag(db_session, schemas.TagCreate(name="Taken"), user_id=user.id)
+
+    updated = crud.update_tag_by_id(db_session, tag_id=tag.id, user_id=user.id, tag_update=schemas.TagUpdate(color="#222222"))
+    assert updated.name == "ById"
+    assert updated.color == "#222222"
+
+    with pytest.raises(ValueError, match="Another tag with this name already exists for this user."):
+        crud.update_tag_by_id(db_session, tag_id=tag.id, user_id=user.id, tag_update=schemas.TagUpdate(name="Taken"))
+
+    assert crud.update_tag_by_id(db_session, tag_id=tag.id, user_id=other_user.id, tag_update=schemas.TagUpdate(color="#333333")) is None
+    assert crud.get_tag(db_session, tag_id=tag.id, user_id=user.id).color == "#222222"
+
+
 def test_delete_tag(db_session: Session):
     user = create_test_user(db_session)
     tag_name = f"DeletableTag_{time.time_ns()}"
@@ -177,7 +209,7 @@ def test_delete_tag(db_session: Session):
     # Test deletion by owner
     deleted_tag = crud.delete_tag(db_session, tag_id=created_tag.id, user_id=user.id)
     assert deleted_tag is not None
-    assert deleted_tag.id == created_tag.id
+    assert deleted_tag == created_tag.id
 
     retrieved_after_delete = crud.get_tag(db_session, tag_id=created_tag.id, user_id=user.id)
     assert retrieved_after_delete is None
@@ -194,3 +226,15 @@ def test_delete_tag(db_session: Session):
     failed_delete_attempt = crud.delete_tag(db_session, tag_id=tag_to_keep.id, user_id=other_user.id)
     assert failed_delete_attempt is None
     assert crud.get_tag(db_session, tag_id=tag_to_keep.id, user_id=user.id) is not None
+
+
+def test_get_tag_by_name_cache_follows_rename(db_session: Session):
+    user = create_test_user(db_session, username_suffix="tagcacheuser")
+    tag = crud.create_tag(db_session, tag_create=schemas.TagCreate(name="cached-name"), user_id=user.id)
+
+    assert crud.get_tag_by_name(db_session, name="cached-name", user_id=user.id).id == tag.id
+    assert crud.get_tag_by_name(db_session, name="cached-name", user_id=user.id).id == tag.id # Served from cache
+
+    crud.update_tag(db_session, db_tag=tag, tag_update=schemas.TagUpdate(name="renamed"), user_id=user.id)
+    assert crud.get_tag_by_name(db_session, name="cached-name", user_id=user.id) is None
+    assert crud.get_tag_by_name(db_session, name="renamed", user_id=user.id).id == tag.id
@@ -151,6 +151,20 @@ def test_get_tasks(db_session: Session):
     paginated_tasks = crud.get_tasks(db_session, user_id=owner.id, limit=1, skip=0)
     assert len(paginated_tasks) == 1
 
+def test_list_tasks_fast(db_session: Session):
+    owner = create_test_user(db_session, username_suffix="fastlistowner")
+    project = create_test_project(db_session, owner_id=owner.id)
+    crud.create_task(db_session, schemas.TaskCreate(title="Second", project_id=project.id, order_in_list=2.0))
+    crud.create_task(db_session, schemas.TaskCreate(title="First", project_id=project.id, order_in_list=1.0, priority=2))
+
+    rows = crud.list_tasks_fast(db_session, project_id=project.id, user_id=owner.id)
+    assert [row["title"] for row in rows] == ["First", "Second"]
+    assert set(rows[0].keys()) == {"id", "title", "completed", "priority", "due_date"}
+    assert rows[0]["priority"] == 2
+
+    other_user = create_test_user(db_session, username_suffix="fastlistother")
+    assert crud.list_tasks_fast(db_session, project_id=project.id, user_id=other_user.id) == []
+
 def test_update_task(db_session: Session):
     owner = create_test_user(db_session, username_suffix="updatetaskowner")
     project = create_test_project(db_session, owner_id=owner.id)
@@ -217,7 +231,7 @@ def test_delete_task(db_session: Session):
     # Test deletion by owner
     deleted_task = crud.delete_task(db_session, task_id=created_task.id, user_id=owner.id)
     assert deleted_task is not None
-    assert deleted_task.id == created_task.id
+    assert deleted_task == created_task.id
 
     retrieved_after_delete = crud.get_task(db_session, task_id=created_task.id, user_id=owner.id)
     assert retrieved_after_delete is None
@@ -246,18 +260,20 @@ def test_add_remove_tag_to_task(db_session: Session):
     tag2 = create_test_tag(db_session, user_id=owner.id, name_suffix="T2")
 
     # Add tag1
-    task_with_tag1 = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=tag1.id, user_id=owner.id)
+    task_with_tag1, already_existed = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=tag1.id, user_id=owner.id)
     assert task_with_tag1 is not None
+    assert already_existed is False
     assert len(task_with_tag1.tags) == 1
     assert tag1 in task_with_tag1.tags
 
     # Add tag2
-    task_with_tags = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=tag2.id, user_id=owner.id)
+    task_with_tags, _ = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=tag2.id, user_id=owner.id)
     assert len(task_with_tags.tags) == 2
     assert tag2 in task_with_tags.tags
 
     # Try adding same tag again (should not duplicate)
-    task_same_tag = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=tag1.id, user_id=owner.id)
+    task_same_tag, already_existed = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=tag1.id, user_id=owner.id)
+    assert already_existed is True
     assert len(task_same_tag.tags) == 2
 
     # Remove tag1
@@ -274,13 +290,13 @@ def test_add_remove_tag_to_task(db_session: Session):
     # Test permissions: other user cannot add tag to a task they don't own
     other_user = create_test_user(db_session, username_suffix="othertaguser")
     other_user_tag = create_test_tag(db_session, user_id=other_user.id, name_suffix="OtherUserTag") # Tag owned by other_user
-    failed_add_other_user = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=other_user_tag.id, user_id=other_user.id)
+    failed_add_other_user, _ = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=other_user_tag.id, user_id=other_user.id)
     assert failed_add_other_user is None
 
     # Test permissions: owner cannot add other user's tag to their own task
     # This depends on crud.add_tag_to_task checking that the tag being added also belongs to the user_id passed.
     # crud.add_tag_to_task should fetch the tag ensuring it belongs to user_id.
-    failed_add_foreign_tag = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=other_user_tag.id, user_id=owner.id)
+    failed_add_foreign_tag, _ = crud.add_tag_to_task(db_session, task_id=db_task.id, tag_id=other_user_tag.id, user_id=owner.id)
     assert failed_add_foreign_tag is None
 
 
@@ -317,3 +333,58 @@ def test_get_tags_for_task(db_session: Session):
     failed_get = crud.get_tags_for_task(db_session, task_id=db_task.id, user_id=other_user.id)
     assert failed_get is not None # crud.get_tags_for_task likely returns [] if task not found for user
     assert len(failed_get) == 0
+
+def test_create_tasks_bulk(db_session: Session):
+    owner = create_test_user(db_session, username_suffix="bulktaskowner")
+    project = create_test_project(db_session, owner_id=owner.id)
+
+    tasks_in = [schemas.TaskCreate(title=f"Bulk Task {i}", project_id=project.id) for i in range(5)]
+    saved = crud.create_tasks_bulk(db_session, tasks_create=tasks_in, batch_size=2)
+    assert saved == 5
+
+    tasks = crud.get_tasks(db_session, user_id=owner.id, project_id=project.id)
+    assert {t.title for t in tasks} == {f"Bulk Task {i}" for i in range(5)}
+
+def test_update_tasks_bulk(db_session: Session):
+    owner = create_test_user(db_session, username_suffix="bulkupdateowner")
+    project = create_test_project(db_session, owner_id=owner.id)
+    task_a = crud.create_task(db_session, task_create=schemas.TaskCreate(title="A", project_id=project.id))
+    task_b = crud.create_task(db_session, task_create=schemas.TaskCreate(title="B", project_id=project.id))
+
+    other_user = create_test_user(db_session, username_suffix="bulkupdateother")
+    other_project = create_test_project(db_session, owner_id=other_user.id)
+    foreign_task = crud.create_task(db_session, task_create=schemas.TaskCreate(title="Foreign", project_id=other_project.id))
+
+    updated = crud.update_tasks_bulk(db_session, [
+        (task_a.id, schemas.TaskUpdate(completed=True)),
+        (task_b.id, schemas.TaskUpdate(title="B2", priority=2)),
+        (foreign_task.id, schemas.TaskUpdate(title="Hijacked")),
+    ], user_id=owner.id)
+    assert updated == 2
+
+    assert crud.get_task(db_session, task_id=task_a.id).completed is True
+    task_b_after = crud.get_task(db_session, task_id=task_b.id)
+    assert task_b_after.title == "B2"
+    assert task_b_after.priority == 2
+    assert crud.get_task(db_session, task_id=foreign_task.id).title == "Foreign"
+
+def test_reorder_tasks(db_session: Session):
+    owner = create_test_user(db_session, username_suffix="reorderowner")
+    project = create_test_project(db_session, owner_id=owner.id)
+    other_project = create_test_project(db_session, owner_id=owner.id, name_suffix="Target")
+    task_a = crud.create_task(db_session, task_create=schemas.TaskCreate(title="A", project_id=project.id))
+    task_b = crud.create_task(db_session, task_create=schemas.TaskCreate(title="B", project_id=project.id))
+
+    reordered = crud.reorder_tasks(db_session, reorder_items=[
+        schemas.TaskReorderItem(task_id=task_b.id, new_order_in_list=1.0, new_status="completed"),
+        schemas.TaskReorderItem(task_id=task_a.id, new_order_in_list=2.0, new_project_id=other_project.id),
+    ], user_id=owner.id)
+
+    assert [t.id for t in reordered] == [task_b.id, task_a.id]
+    assert reordered[0].order_in_list == 1.0
+    assert reordered[0].completed is True
+    assert reordered[1].project_id == other_project.id
+
+    other_user = create_test_user(db_session, username_suffix="reorderother")
+    with pytest.raises(Exception, match="not found or user does not have access"):
+        crud.reorder_tasks(db_session, reorder_items=[schemas.TaskReorderItem(task_id=task_a.id, new_order_in_list=3.0)], user_id=other_user.id)
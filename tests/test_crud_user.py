@@ -158,7 +158,7 @@ def test_delete_user(db_session: Session):
 
     deleted_user = crud.delete_user(db_session, user_id=created_user.id)
     assert deleted_user is not None
-    assert deleted_user.id == created_user.id
+    assert deleted_user == created_user.id
 
     retrieved_after_delete = crud.get_user(db_session, user_id=created_user.id)
     assert retrieved_after_delete is None
@@ -166,3 +166,48 @@ def test_delete_user(db_session: Session):
     # Test deleting non-existent user
     non_existent_deleted_user = crud.delete_user(db_session, user_id=99999)
     assert non_existent_deleted_user is None
+
+
+def test_create_users_bulk(db_session: Session):
+    users_in = [schemas.UserCreate(**USER_TEST_DATA_1), schemas.UserCreate(**USER_TEST_DATA_2)]
+    assert crud.create_users_bulk(db_session, users_create=users_in) == 2
+
+    for data in (USER_TEST_DATA_1, USER_TEST_DATA_2):
+        db_user = crud.get_user_by_username(db_session, username=data["username"])
+        assert db_user is not None
+        assert verify_password(data["password"], db_user.hashed_password)
+
+
+def test_authenticate_user_upgrades_low_cost_hash(db_session: Session):
+    import bcrypt
+    from app.core.config import settings
+
+    user_in = schemas.UserCreate(**USER_TEST_DATA_1)
+    weak_hash = bcrypt.hashpw(USER_TEST_DATA_1["password"].encode(), bcrypt.gensalt(4)).decode()
+    db_user = crud.create_user(db_session, user_create=user_in)
+    db_user.hashed_password = weak_hash # As if stored before BCRYPT_ROUNDS was raised
+    db_session.commit()
+
+    assert crud.authenticate_user(db_session, username=USER_TEST_DATA_1["username"], password="wrong-password") is None
+    assert db_user.hashed_password == weak_hash # Not re-hashed on a failed login
+
+    # Email works as the login name too
+    authenticated = crud.authenticate_user(db_session, username=USER_TEST_DATA_1["email"], password=USER_TEST_DATA_1["password"])
+    assert authenticated is not None and authenticated.id == db_user.id
+    assert authenticated.hashed_password != weak_hash
+    assert authenticated.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert verify_password(USER_TEST_DATA_1["password"], authenticated.hashed_password)
+
+
+def test_get_user_principal_follows_updates(db_session: Session):
+    db_user = crud.create_user(db_session, user_create=schemas.UserCreate(**USER_TEST_DATA_1))
+
+    principal = crud.get_user_principal(db_session, username=USER_TEST_DATA_1["username"])
+    assert principal == crud.UserPrincipal(id=db_user.id, username=USER_TEST_DATA_1["username"], is_active=True)
+
+    # A cached principal must not outlive a deactivation or rename
+    crud.update_user(db_session, db_user=db_user, user_update=schemas.UserUpdate(is_active=False))
+    assert crud.get_user_principal(db_session, username=USER_TEST_DATA_1["username"]).is_active is False
+    crud.update_user(db_session, db_user=db_user, user_update=schemas.UserUpdate(username="renamed_user"))
+    assert crud.get_user_principal(db_session, username=USER_TEST_DATA_1["username"]) is None
+    assert crud.get_user_principal(db_session, username="renamed_user").id == db_user.id
@@ -23,3 +23,13 @@ def test_read_main(client: TestClient):
     # Let's assume a generic welcome message for now.
     # This will be adjusted after the first test run if necessary.
     assert "Welcome" in response.text or "FastAPI" in response.text or response.json() is not None
+
+
+def test_large_responses_are_gzipped(client: TestClient):
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["info"]["title"] == "ZenithTask API" # httpx decompresses transparently
+
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers # Below minimum_size